@@ -0,0 +1,113 @@
+''' Imports '''
+import csv
+import os
+import re
+import time
+from concurrent.futures import as_completed
+import vault_core
+from metrics import metrics, span
+from parallel_ingest import process_pool, worker_count
+from storage import ENTRY_COLUMNS, contract_key
+
+''' Configurations '''
+REPORT_WORKERS = 0  # processes rendering PDFs, 0 = one less than the CPU count
+REPORT_INDEX = "report_index.csv"  # summary written next to the reports
+
+
+''' Helpers '''
+# the same file name a single Print or CLI report uses; taken holds the names already
+# used by the batch, and a contract that sanitizes to one of them gets a numeric suffix
+def report_filename(contract, taken=None):
+    contract_name = re.sub(r'[^\w\-]', '_', contract.strip())
+    filename = f"timecard_report_{contract_name}.pdf"
+    if taken is not None:
+        number = 1
+        while filename.lower() in taken:
+            number += 1
+            filename = f"timecard_report_{contract_name}_{number}.pdf"
+        taken.add(filename.lower())
+    return filename
+
+# runs in a worker: render one contract's report; returns (rows, total hours, timing spans)
+def render_report(filename, rows, title):
+    # reportlab is only imported by the processes that draw
+    from report_engine import write_report
+
+    metrics.clear()
+    total_hours = write_report(filename, ENTRY_COLUMNS, rows, title=title)
+    return len(rows), total_hours, metrics.recent()
+
+def write_index(path, summary):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Contract", "File", "Entries", "Hours", "Status"])
+        for contract, filename, rows, hours, status in sorted(summary):
+            writer.writerow([contract, filename, rows, round(hours, 2), status])
+
+
+''' Batch Reports '''
+# one PDF per contract in out_dir, rendered in worker processes
+# contracts limits the batch (default: every contract with entries in the period); the rows come
+# from one query ordered by contract, and progress_callback(done, total) follows the renders
+# returns [(contract, file, rows, hours, status)], also written to REPORT_INDEX; after a cancel,
+# reports that were not rendered (or contracts not reached) are listed as "cancelled"
+def write_contract_reports(out_dir, contracts=None, month=None, year=None, workers=None, progress_callback=None, cancel_event=None):
+    os.makedirs(out_dir, exist_ok=True)
+    wanted = {contract_key(contract): contract.strip() for contract in contracts or () if contract.strip()}
+    period = " ".join(part for part in (month, year) if part)
+    summary = []
+    taken = set()  # lower-cased file names, so names differing only in case don't collide either
+    done = 0
+    start = time.perf_counter()
+    cancelled = lambda: cancel_event is not None and cancel_event.is_set()
+
+    with span("batch reports") as timing:
+        executor = process_pool(worker_count(REPORT_WORKERS if workers is None else workers, len(wanted) or None))
+        try:
+            futures = {}
+            for key, rows in vault_core.get_store().entries_by_contract(month or None, year or None, list(wanted)):
+                if cancelled():
+                    break
+                contract = wanted.pop(key, None) or rows[0][4]
+                filename = report_filename(contract, taken)
+                title = f"Timecard Report: {contract}" + (f" ({period})" if period else "")
+                futures[executor.submit(render_report, os.path.join(out_dir, filename), rows, title)] = (contract, filename)
+
+            # requested contracts without entries still get a line in the index,
+            # unless a cancel stopped the query before it reached them
+            for contract in wanted.values():
+                summary.append((contract, "", 0, 0, "cancelled" if cancelled() else "no entries"))
+
+            total = len(futures)
+            if progress_callback:
+                progress_callback(0, total)
+            for future in as_completed(futures):
+                done += 1
+                if progress_callback:
+                    progress_callback(done, total)
+                if cancelled():
+                    break
+        finally:
+            # cancel drops the reports not started yet, the running ones finish
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        # every report that finished goes into the index, including those done after a cancel
+        done = 0
+        for future, (contract, filename) in futures.items():
+            if future.cancelled():
+                summary.append((contract, "", 0, 0, "cancelled"))
+                continue
+            try:
+                rows, hours, spans = future.result()
+                metrics.extend(spans)
+                summary.append((contract, filename, rows, hours, "ok"))
+                done += 1
+            except Exception as e:
+                print(f"Failed to write the report for {contract}: {e}")
+                summary.append((contract, filename, 0, 0, f"failed: {e}"))
+        timing["rows"] = sum(item[2] for item in summary)
+        timing["reports"] = done
+
+    write_index(os.path.join(out_dir, REPORT_INDEX), summary)
+    print(f"Wrote {done} reports to {out_dir} in {time.perf_counter() - start:.2f}s")
+    return summary
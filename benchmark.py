@@ -0,0 +1,283 @@
+''' Imports '''
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+import vault_core
+from entry_cache import EntryCache
+from pivot import build_pivot
+from snapshot import EntrySnapshot
+from periods import MONTHS, period_key
+from storage import ENTRY_COLUMNS, contract_key
+
+''' Configurations '''
+DEFAULT_SIZES = [10000, 100000, 1000000]
+DEFAULT_IMPORT_ROWS = 100000  # entries imported from generated workbooks per size, the rest are bulk seeded
+ROWS_PER_SHEET = 50  # contract lines per month sheet, the template has room for about 53
+SHEETS_PER_FILE = 12
+CONTRACT_COUNT = 200
+EXPORT_ROWS = 10000  # rows written by the PDF export benchmark
+DELETE_ROWS = 5000  # rows removed by each delete benchmark
+RUNS = 5  # repeats of each read benchmark
+PROJECT_MANAGERS = ["A. Rivera", "B. Chen", "C. Okafor", "D. Novak", "E. Haddad", "F. Lindqvist"]
+CONTRACT_PREFIXES = ["NAVSEA", "USACE", "DHS", "GSA", "NASA", "DOE", "FAA", "VA"]
+# column headings of Empty Timecard Template.xls
+TEMPLATE_COLUMNS = (
+    ["Name", "Month", "Year", "", "Contract Name", "Project Manager", "CP / CWD FP / FWD"]
+    + list(range(1, 32))
+    + ["Totals", " ", "Location / Name", "Hours"]
+)
+
+
+''' Workbook Generator '''
+def contract_names(count):
+    return [f"{CONTRACT_PREFIXES[i % len(CONTRACT_PREFIXES)]}-{i:04d}" for i in range(count)]
+
+# one month sheet in the template layout: name/month/year on the first line, daily hours per contract
+def timecard_sheet(rng, employee, month, year, rows, contracts):
+    import pandas as pd
+
+    lines = []
+    for i in range(rows):
+        days = [0.0] * 31
+        for day in rng.sample(range(31), rng.randint(1, 20)):
+            days[day] = float(rng.choice([0.5, 1, 2, 4, 8]))
+        lines.append(
+            [employee if i == 0 else None, month if i == 0 else None, year if i == 0 else None, None,
+             rng.choice(contracts), rng.choice(PROJECT_MANAGERS), rng.choice(["CP", "CWD", "FP", "FWD"])]
+            + days
+            + [sum(days), None, None, None]
+        )
+    return pd.DataFrame(lines, columns=[str(col) for col in TEMPLATE_COLUMNS])
+
+# write a workbook of month sheets plus the template's Example sheet; returns the entries it should import
+def write_workbook(path, rng, employee, year, sheets=SHEETS_PER_FILE, rows=ROWS_PER_SHEET, contracts=None):
+    import pandas as pd
+
+    contracts = contracts or contract_names(CONTRACT_COUNT)
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for month in MONTHS[:sheets]:
+            timecard_sheet(rng, employee, month.title(), year, rows, contracts).to_excel(writer, sheet_name=month.title(), index=False)
+        timecard_sheet(rng, "Example", "January", year, 3, contracts).to_excel(writer, sheet_name="Example", index=False)
+    return sheets * rows
+
+# enough workbooks for about entries rows, one employee per file; files caps the workbook count
+def generate_workbooks(directory, entries, rng, sheets=SHEETS_PER_FILE, rows=ROWS_PER_SHEET, contracts=None, files=None):
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    written = 0
+    while written < entries and (files is None or len(paths) < files):
+        index = len(paths)
+        path = os.path.join(directory, f"Time card {index:05d}.xlsx")
+        sheet_count = min(sheets, -(-(entries - written) // rows))
+        written += write_workbook(path, rng, f"Employee {index:05d}", 2020 + index % 6, sheet_count, rows, contracts)
+        paths.append(path)
+    return paths
+
+# INSERT_COLUMNS tuples for entries beyond what the workbooks import
+def synthetic_rows(rng, count, contracts, start=0):
+    rows = []
+    for i in range(start, start + count):
+        month = MONTHS[i % 12].title()
+        year = str(2020 + (i // 600) % 6)
+        contract = rng.choice(contracts)
+        rows.append((
+            f"Employee {i // 600:05d}", month, year, contract, rng.choice(PROJECT_MANAGERS),
+            float(rng.randint(1, 160)), f"Seeded{i // 600:05d}.xlsx", month, period_key(month, year), contract_key(contract),
+        ))
+    return rows
+
+
+''' Timing '''
+# run fn a few times and summarise the wall time in milliseconds
+def timed(fn, runs=RUNS):
+    times = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    summary = {
+        "runs": runs,
+        "min_ms": round(min(times), 3),
+        "median_ms": round(statistics.median(times), 3),
+        "max_ms": round(max(times), 3),
+    }
+    return summary, result
+
+def log(message):
+    print(message, flush=True)
+
+
+''' Benchmarks '''
+# time every hot path against a fresh SQLite database holding entries rows
+def run_size(entries, workdir, args, rng):
+    contracts = contract_names(args.contracts)
+    db_path = os.path.join(workdir, f"bench_{entries}.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    vault_core.configure("sqlite", db_path)
+    store = vault_core.get_store()
+    results = {}
+
+    # import generated workbooks through the bulk path; --files sets the workbook count instead of --import-rows
+    if args.files:
+        import_rows = min(entries, args.files * args.sheets * args.rows_per_sheet)
+    else:
+        import_rows = min(entries, args.import_rows)
+    book_dir = os.path.join(workdir, f"books_{import_rows}_{args.sheets}x{args.rows_per_sheet}")
+    if not os.path.isdir(book_dir):
+        log(f"[{entries}] generating workbooks for {import_rows} entries")
+        generate_workbooks(book_dir, import_rows, rng, args.sheets, args.rows_per_sheet, contracts, args.files)
+    paths = vault_core.find_workbooks(book_dir)
+
+    log(f"[{entries}] importing {len(paths)} workbooks")
+    manifest = vault_core.load_manifest()
+    start = time.perf_counter()
+    imported = 0
+    for path in paths:
+        imported += vault_core.import_workbook(path, manifest=manifest)
+    elapsed = time.perf_counter() - start
+    results["import_workbook"] = {
+        "workbooks": len(paths),
+        "rows": imported,
+        "total_ms": round(elapsed * 1000, 3),
+        "rows_per_s": round(imported / elapsed) if elapsed > 0 else None,
+    }
+
+    # one sheet on its own, the way a single-sheet upload runs, from a workbook of its own
+    single_path = os.path.join(workdir, f"single_{entries}.xlsx")
+    write_workbook(single_path, rng, "Single Sheet", 2024, sheets=1, rows=args.rows_per_sheet, contracts=contracts)
+    sheet_name, df = next(iter(vault_core.read_workbook(single_path).items()))
+    start = time.perf_counter()
+    rows = vault_core.import_timecard(single_path, sheet_name=sheet_name, df=df)
+    results["import_timecard"] = {"rows": rows, "total_ms": round((time.perf_counter() - start) * 1000, 3)}
+
+    # top up with seeded rows so the read benchmarks see the full size
+    count = store.db.query("count", "SELECT COUNT(*) FROM Entries")[0][0]
+    if count < entries:
+        log(f"[{entries}] seeding {entries - count} rows")
+        with store.transaction("seed"):
+            for start_row in range(count, entries, vault_core.INSERT_BATCH_SIZE):
+                store.insert_batch(synthetic_rows(rng, min(vault_core.INSERT_BATCH_SIZE, entries - start_row), contracts, start_row))
+
+    log(f"[{entries}] timing reads")
+    cache = EntryCache(store)
+    results["load_all_data"], loaded = timed(cache.load, runs=min(args.runs, 3))
+    results["load_all_data"]["rows"] = len(loaded)
+
+    # warm start from the columnar snapshot, when pyarrow is installed
+    snapshot = EntrySnapshot.for_store(store)
+    if snapshot is not None:
+        snapshot.remove()
+        cache.snapshot = snapshot
+        cache.snapshot_dirty = True
+        results["snapshot_write"], _ = timed(cache.save_snapshot, runs=1)
+        results["load_all_data_snapshot"], from_snapshot = timed(EntryCache(store, snapshot).load, runs=min(args.runs, 3))
+        results["load_all_data_snapshot"]["rows"] = len(from_snapshot)
+        results["snapshot_hours_by_contract"], by_contract = timed(lambda: snapshot.hours_by("Contract_Name"), args.runs)
+        results["snapshot_hours_by_contract"]["groups"] = len(by_contract)
+        # the snapshot sits in the user's cache, not in the work directory that gets removed
+        snapshot.remove()
+
+    contract = contracts[len(contracts) // 2]
+    term = contract[-3:].lower()  # substring, like a partial name in the search box
+    results["search"], found = timed(lambda: cache.search(Contract_Name=term), args.runs)
+    results["search"]["rows"] = len(found)
+    results["calculate_hours"], _ = timed(lambda: store.sum_hours(term), args.runs)
+    results["advanced_calculate_hours"], subtotals = timed(lambda: store.period_hours(contract, "Jan 2021 - Dec 2024", None, exact=True), args.runs)
+    results["advanced_calculate_hours"]["periods"] = len(subtotals)
+    results["advanced_search"], found = timed(lambda: store.search(contract, "FY23", None, exact=True), args.runs)
+    results["advanced_search"]["rows"] = len(found)
+    results["pivot"], pivot = timed(lambda: build_pivot(loaded), runs=min(args.runs, 3))
+    results["pivot"]["groups"] = len(pivot.detail)
+
+    # PDF export of a fixed slice so sizes stay comparable
+    try:
+        from report_engine import write_report
+        export_rows = loaded[:args.export_rows]
+        pdf_path = os.path.join(workdir, "bench_report.pdf")
+        results["export_treeview_to_pdf"], _ = timed(lambda: write_report(pdf_path, ENTRY_COLUMNS, export_rows), runs=1)
+        results["export_treeview_to_pdf"]["rows"] = len(export_rows)
+    except ImportError as e:
+        log(f"[{entries}] skipping PDF export: {e}")
+
+    # deletes last, each run removes different rows
+    keys = [row[0] for row in loaded]
+    delete_rows = max(1, min(args.delete_rows, len(keys) // 2))
+    selection = keys[-delete_rows:]  # a contiguous block, like one bad upload
+    scattered = keys[:-delete_rows][::max(1, (len(keys) - delete_rows) // delete_rows)][:delete_rows]
+    results["delete_entries"], _ = timed(lambda: store.delete_entries(selection), runs=1)
+    results["delete_entries"]["rows"] = len(selection)
+    results["delete_entries_scattered"], _ = timed(lambda: store.delete_entries(scattered), runs=1)
+    results["delete_entries_scattered"]["rows"] = len(scattered)
+
+    return {"entries": entries, "timings": results}
+
+def run(args):
+    rng = random.Random(args.seed)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="timecard_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "excel_engine": vault_core.excel_engine() or "pandas default",
+        "config": {
+            "sizes": args.sizes,
+            "import_rows": args.import_rows,
+            "files": args.files,
+            "sheets": args.sheets,
+            "rows_per_sheet": args.rows_per_sheet,
+            "contracts": args.contracts,
+            "runs": args.runs,
+            "seed": args.seed,
+        },
+        "results": [],
+    }
+    try:
+        for entries in args.sizes:
+            report["results"].append(run_size(entries, workdir, args, rng))
+            log(json.dumps(report["results"][-1]))
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    log(f"Wrote {args.out}")
+    return report
+
+
+''' Argument Parsing '''
+def build_parser():
+    parser = argparse.ArgumentParser(prog="timecard-benchmark", description="Time import, search, totals, delete and PDF export against a local SQLite database.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="entry counts to benchmark")
+    parser.add_argument("--import-rows", type=int, default=DEFAULT_IMPORT_ROWS, help="entries per size imported from generated workbooks, the rest are seeded directly")
+    parser.add_argument("--files", type=int, help="workbooks generated per size (default: as many as --import-rows needs)")
+    parser.add_argument("--sheets", type=int, default=SHEETS_PER_FILE, choices=range(1, 13), metavar="1-12", help="month sheets per workbook")
+    parser.add_argument("--rows-per-sheet", type=int, default=ROWS_PER_SHEET)
+    parser.add_argument("--contracts", type=int, default=CONTRACT_COUNT, help="distinct contract names")
+    parser.add_argument("--export-rows", type=int, default=EXPORT_ROWS)
+    parser.add_argument("--delete-rows", type=int, default=DELETE_ROWS)
+    parser.add_argument("--runs", type=int, default=RUNS, help="repeats of each read benchmark")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workdir", help="keep generated workbooks and databases here (default: a temporary directory)")
+    parser.add_argument("--out", default=f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json", help="JSON results file")
+    return parser
+
+def main(argv=None):
+    run(build_parser().parse_args(argv))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
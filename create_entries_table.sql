@@ -1,12 +1,16 @@
 CREATE TABLE Entries (
     Entry_ID AUTOINCREMENT PRIMARY KEY,
     Employee_ID INTEGER,
+    [Name] VARCHAR(50),
     [Month] VARCHAR(30),
     [Year] VARCHAR(4),
     Contract_Name VARCHAR(40),
+    Project_Manager VARCHAR(50),
     Hours DOUBLE,
     Source_File VARCHAR(50),
-    Sheet_Name VARCHAR(20)
+    Sheet_Name VARCHAR(20),
+    Period INTEGER,
+    Contract_Key VARCHAR(40)
 );
 
 
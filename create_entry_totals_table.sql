@@ -0,0 +1,10 @@
+CREATE TABLE Entry_Totals (
+    Contract_Name VARCHAR(40),
+    [Year] VARCHAR(4),
+    [Month] VARCHAR(30),
+    Total_Hours DOUBLE,
+    Row_Count INTEGER,
+    Contract_Key VARCHAR(40),
+    Period INTEGER,
+    CONSTRAINT pk_entry_totals PRIMARY KEY (Contract_Name, [Year], [Month])
+);
@@ -0,0 +1,7 @@
+CREATE TABLE Ingest_Manifest (
+    Content_Hash VARCHAR(64),
+    Source_File VARCHAR(50),
+    Sheet_Name VARCHAR(20),
+    Row_Count INTEGER,
+    Imported_At DATETIME
+);
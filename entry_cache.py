@@ -0,0 +1,177 @@
+''' Imports '''
+import threading
+from metrics import span
+from search_index import SearchIndex
+
+
+''' Configurations '''
+SNAPSHOT_CHUNK_ROWS = 50000  # rows indexed between progress reports when loading from the snapshot
+
+
+''' Entry Cache '''
+# one shared copy of the Entries table, loaded once and then kept in sync incrementally
+# with a snapshot, startup reads the columnar file and only asks the database for newer rows
+class EntryCache:
+    def __init__(self, store, snapshot=None):
+        self.store = store
+        self.snapshot = snapshot  # EntrySnapshot or None
+        self.snapshot_dirty = False  # rows changed since the snapshot was written
+        self.snapshot_full = True  # the next write rewrites the whole snapshot instead of appending a delta
+        self.snapshot_added = {}  # Entry_ID -> row added since the snapshot was written
+        self.snapshot_deleted = set()  # Entry_IDs deleted since the snapshot was written
+        self.rows = {}  # Entry_ID -> ENTRY_COLUMNS tuple, in Entry_ID order
+        self.last_seen_max = 0
+        self.loaded = False
+        self.pending_deletes = set()  # Entry_IDs deleted while a load was streaming, dropped again once it ends
+        self.index = SearchIndex()
+        self.lock = threading.Lock()
+        self.snapshot_lock = threading.Lock()  # one snapshot write at a time
+
+    # full load, used once at startup (or to recover from changes made elsewhere)
+    # streamed in chunks; on_chunk(rows loaded so far) reports progress
+    def load(self, on_chunk=None):
+        with self.lock:
+            self.loaded = False
+            self.rows = {}
+            self.last_seen_max = 0
+            self.index.clear()
+            self.snapshot_added = {}
+            self.snapshot_deleted = set()
+
+        with span("table load") as timing:
+            count = self.load_snapshot(on_chunk) if self.snapshot is not None else None
+            timing["source"] = "snapshot"
+            if count is None:
+                timing["source"] = self.store.name
+                count = 0
+                for rows in self.store.iter_entries():
+                    with self.lock:
+                        self.add_rows(rows)
+                    count += len(rows)
+                    if on_chunk:
+                        on_chunk(count)
+                self.snapshot_dirty = True
+                self.snapshot_full = True
+            timing["rows"] = count
+
+        with self.lock:
+            # the load may have read rows that were deleted while it ran
+            self.drop_rows(self.pending_deletes)
+            self.pending_deletes = set()
+            self.loaded = True
+        return self.entries()
+
+    # fill from the snapshot plus the rows added after it; None (nothing loaded) when the
+    # snapshot is missing or rows it holds were deleted or changed elsewhere
+    def load_snapshot(self, on_chunk=None):
+        rows, stamp = self.snapshot.read()
+        if rows is None:
+            return None
+        max_id, row_count = stamp
+        db_count, db_max = self.store.entry_stats()
+        newer = self.store.load_entries(after_id=max_id) if db_max > max_id else []
+        # max_id stays where the cache last synced to, even if that entry was deleted since
+        if row_count + len(newer) != db_count:
+            print(f"Snapshot is out of date ({row_count} rows to Entry_ID {max_id}, database has {db_count} to {db_max}), loading from {self.store.name}")
+            return None
+
+        count = 0
+        for start in range(0, len(rows), SNAPSHOT_CHUNK_ROWS):
+            with self.lock:
+                self.add_rows(rows[start:start + SNAPSHOT_CHUNK_ROWS])
+            count = min(start + SNAPSHOT_CHUNK_ROWS, len(rows))
+            if on_chunk:
+                on_chunk(count)
+        with self.lock:
+            self.add_rows(newer)
+            self.snapshot_added = {row[0]: row for row in newer}
+        self.snapshot_dirty = bool(newer)
+        self.snapshot_full = False
+        return count + len(newer)
+
+    # write what changed since the snapshot was written, as a delta or (after a load from the
+    # database, or once deltas pile up) as a whole new file; safe to call from any thread
+    def save_snapshot(self):
+        if self.snapshot is None or not self.loaded:
+            return 0
+        with self.snapshot_lock:
+            with self.lock:
+                if not self.snapshot_dirty:
+                    return 0
+                full = self.snapshot_full or self.snapshot.needs_rewrite()
+                rows = list(self.rows.values()) if full else None
+                added, deleted = list(self.snapshot_added.values()), list(self.snapshot_deleted)
+                max_id, row_count = self.last_seen_max, len(self.rows)
+                self.snapshot_dirty = self.snapshot_full = False
+                self.snapshot_added, self.snapshot_deleted = {}, set()
+            try:
+                if full:
+                    return self.snapshot.write(rows, max_id)
+                return self.snapshot.append(added, deleted, max_id, row_count)
+            except Exception as e:
+                # what this write would have recorded is lost, so the next one starts over
+                with self.lock:
+                    self.snapshot_dirty = self.snapshot_full = True
+                print(f"Failed to write snapshot {self.snapshot.path}: {e}")
+                return 0
+
+    # pull only the entries added since the last sync
+    def sync(self):
+        if not self.loaded:
+            return self.load()
+        rows = self.store.load_entries(after_id=self.last_seen_max)
+        with self.lock:
+            rows = [row for row in rows if row[0] not in self.rows]
+            self.add_rows(rows)
+            if rows:
+                self.snapshot_added.update((row[0], row) for row in rows)
+                self.snapshot_dirty = True
+        return rows
+
+    def add_rows(self, rows):
+        for row in rows:
+            self.rows[row[0]] = row
+            self.index.add(row)
+            if row[0] > self.last_seen_max:
+                self.last_seen_max = row[0]
+
+    # drop deleted entries locally instead of reloading the table; returns the Entry_IDs trees should drop
+    # before the load has finished they are also kept to be dropped again at its end, so all are returned
+    def apply_deletes(self, keys):
+        with self.lock:
+            removed = self.drop_rows(keys)
+            if not self.loaded:
+                self.pending_deletes.update(keys)
+                return list(keys)
+        return removed
+
+    def drop_rows(self, keys):
+        removed = []
+        for key in keys:
+            row = self.rows.pop(key, None)
+            if row is not None:
+                self.index.remove(row)
+                removed.append(key)
+                if self.snapshot_added.pop(key, None) is None:
+                    self.snapshot_deleted.add(key)
+        if removed:
+            self.snapshot_dirty = True
+        return removed
+
+    def get(self, entry_id):
+        return self.rows.get(entry_id)
+
+    # rows whose columns contain the given terms, e.g. search(Contract_Name="abc", Year="2024")
+    def search(self, **terms):
+        with self.lock:
+            ids = self.index.search(**terms)
+            if ids is None:
+                return list(self.rows.values())
+            return [self.rows[entry_id] for entry_id in sorted(ids)]
+
+    def entries(self):
+        with self.lock:
+            return list(self.rows.values())
+
+    def __len__(self):
+        return len(self.rows)
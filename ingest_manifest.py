@@ -0,0 +1,61 @@
+''' Imports '''
+import threading
+
+''' Configurations '''
+NEW = "new"
+DUPLICATE = "duplicate"  # same content already imported, under any file name
+CHANGED = "changed"  # same file and sheet imported before with different content
+UNKNOWN = "unknown"  # same file and sheet imported before the manifest kept hashes
+
+
+''' Ingest Manifest '''
+# in-memory copy of Ingest_Manifest, loaded once per import batch so duplicate checks are set lookups
+class IngestManifest:
+    def __init__(self, store):
+        self.store = store
+        self.hashes = set()
+        self.sources = {}  # (Source_File, Sheet_Name) -> content hash, None for sheets imported before the manifest
+        self.pending = []  # sheets recorded in the open transaction, applied on commit
+        self.lock = threading.Lock()
+
+    def load(self):
+        rows = self.store.load_manifest()
+        with self.lock:
+            self.hashes = {content_hash for content_hash, file_name, sheet_name in rows if content_hash}
+            self.sources = {(file_name, sheet_name): content_hash for content_hash, file_name, sheet_name in rows}
+            self.pending = []
+        return self
+
+    def check(self, content_hash, file_name, sheet_name):
+        with self.lock:
+            staged = {entry[0] for entry in self.pending}
+            if content_hash in self.hashes or content_hash in staged:
+                return DUPLICATE
+            if (file_name, sheet_name) in self.sources:
+                return CHANGED if self.sources[(file_name, sheet_name)] else UNKNOWN
+            return NEW
+
+    # write the manifest row now, update the in-memory copy once the import commits
+    def record(self, content_hash, file_name, sheet_name, row_count):
+        self.store.record_ingest(content_hash, file_name, sheet_name, row_count)
+        with self.lock:
+            self.pending.append((content_hash, file_name, sheet_name))
+
+    # give a sheet listed without a hash this content's hash, applied like record on commit
+    def backfill(self, content_hash, file_name, sheet_name):
+        self.store.fill_ingest_hash(content_hash, file_name, sheet_name)
+        with self.lock:
+            self.pending.append((content_hash, file_name, sheet_name))
+
+    def commit(self):
+        with self.lock:
+            for content_hash, file_name, sheet_name in self.pending:
+                old_hash = self.sources.get((file_name, sheet_name))
+                self.hashes.discard(old_hash)
+                self.hashes.add(content_hash)
+                self.sources[(file_name, sheet_name)] = content_hash
+            self.pending = []
+
+    def rollback(self):
+        with self.lock:
+            self.pending = []
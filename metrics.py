@@ -0,0 +1,89 @@
+''' Imports '''
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+''' Configurations '''
+METRICS_SIZE = 5000  # spans kept in memory, the oldest are dropped first
+
+
+''' Metrics Store '''
+# rolling, thread-safe record of timed spans
+class MetricsStore:
+    def __init__(self, size=METRICS_SIZE):
+        self.spans = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def record(self, name, seconds, rows=None, **fields):
+        entry = {
+            "name": name,
+            "at": round(time.time(), 3),
+            "ms": round(seconds * 1000, 3),
+            "rows": rows,
+            "thread": threading.current_thread().name,
+        }
+        entry.update(fields)
+        with self.lock:
+            self.spans.append(entry)
+
+    # spans recorded elsewhere, e.g. in an ingest worker process
+    def extend(self, spans):
+        with self.lock:
+            self.spans.extend(spans)
+
+    def recent(self, limit=None):
+        with self.lock:
+            spans = list(self.spans)
+        return spans[-limit:] if limit else spans
+
+    # {name: count, total/avg/p95/max ms, rows, rows per second} over the spans still held
+    def summary(self):
+        grouped = {}
+        for entry in self.recent():
+            grouped.setdefault(entry["name"], []).append(entry)
+
+        summary = {}
+        for name, spans in grouped.items():
+            times = sorted(entry["ms"] for entry in spans)
+            rows = sum(entry["rows"] or 0 for entry in spans)
+            total = sum(times)
+            summary[name] = {
+                "count": len(times),
+                "total_ms": round(total, 3),
+                "avg_ms": round(total / len(times), 3),
+                "p95_ms": times[min(len(times) - 1, int(len(times) * 0.95))],
+                "max_ms": times[-1],
+                "rows": rows,
+                "rows_per_s": round(rows / (total / 1000)) if rows and total else None,
+            }
+        return summary
+
+    # one JSON object per span, oldest first; returns how many were written
+    def export_jsonl(self, path):
+        spans = self.recent()
+        with open(path, "w") as f:
+            for entry in spans:
+                f.write(json.dumps(entry, default=str) + "\n")
+        return len(spans)
+
+    def clear(self):
+        with self.lock:
+            self.spans.clear()
+
+
+# the store every module records into
+metrics = MetricsStore()
+
+# time a block; set rows (or other fields) on the yielded dict once they are known
+@contextmanager
+def span(name, rows=None, **fields):
+    details = {"rows": rows}
+    details.update(fields)
+    start = time.perf_counter()
+    try:
+        yield details
+    finally:
+        rows = details.pop("rows", None)
+        metrics.record(name, time.perf_counter() - start, rows, **details)
@@ -0,0 +1,97 @@
+''' Imports '''
+from datetime import datetime
+from periods import period_key
+from storage import TABLE_NAME, TOTALS_TABLE, contract_key
+
+''' Configurations '''
+VERSION_TABLE = "Schema_Version"
+VERSION_SCHEMA = f"""
+    CREATE TABLE {VERSION_TABLE} (
+        Version INTEGER,
+        Description VARCHAR(100),
+        Applied_At DATETIME
+    )
+    """
+
+
+''' Migration Helpers '''
+# DDL that may already have been applied (new databases start from the current schema files)
+def add_column(store, conn, table, column, column_type):
+    if store.has_table(conn, table) and not store.has_column(conn, table, column):
+        store.run(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+def add_index(store, conn, table, name, columns):
+    if not store.has_index(conn, table, name):
+        store.run(f"CREATE INDEX {name} ON {table} ({columns})")
+
+# fill a derived column once per distinct source value instead of once per row
+def backfill(store, conn, table, column, sources, derive):
+    if not store.has_table(conn, table):
+        return
+    where = " AND ".join(f"{source} = ?" for source in sources)
+    cursor = store.run(f"SELECT DISTINCT {', '.join(sources)} FROM {table} WHERE {column} IS NULL")
+    for values in cursor.fetchall():
+        value = derive(*values)
+        if value is not None:
+            store.run(f"UPDATE {table} SET {column} = ? WHERE {where}", (value, *values))
+
+
+''' Migrations '''
+def create_indexes(store, conn):
+    add_index(store, conn, TABLE_NAME, "idx_entries_contract", "Contract_Name")
+    add_index(store, conn, TABLE_NAME, "idx_entries_source", "Source_File, Sheet_Name")
+    add_index(store, conn, TABLE_NAME, "idx_entries_period", "[Year], [Month]")
+
+def add_period(store, conn):
+    for table in (TABLE_NAME, TOTALS_TABLE):
+        add_column(store, conn, table, "Period", "INTEGER")
+        backfill(store, conn, table, "Period", ("[Month]", "[Year]"), period_key)
+
+def add_contract_key(store, conn):
+    for table in (TABLE_NAME, TOTALS_TABLE):
+        add_column(store, conn, table, "Contract_Key", "VARCHAR(40)")
+        backfill(store, conn, table, "Contract_Key", ("Contract_Name",), contract_key)
+    add_index(store, conn, TABLE_NAME, "idx_entries_contract_key", "Contract_Key, Period")
+
+# Entry_Totals created before this version has no index for the period range queries
+def index_totals(store, conn):
+    if store.has_table(conn, TOTALS_TABLE):
+        add_index(store, conn, TOTALS_TABLE, "idx_totals_contract_key", "Contract_Key, Period")
+
+# rows whose month is a misspelling like the template's "Feburary" were left without a Period
+def refill_period(store, conn):
+    for table in (TABLE_NAME, TOTALS_TABLE):
+        backfill(store, conn, table, "Period", ("[Month]", "[Year]"), period_key)
+
+# (version, description, migration) in the order they are applied; only ever append
+MIGRATIONS = [
+    (1, "indexes on contract, source file/sheet and month/year", create_indexes),
+    (2, "numeric YYYYMM Period column", add_period),
+    (3, "normalized Contract_Key column", add_contract_key),
+    (4, "index on Entry_Totals contract key and period", index_totals),
+    (5, "Period for misspelled month names", refill_period),
+]
+
+
+''' Runner '''
+def current_version(store):
+    with store.db.transaction("migrate") as conn:
+        if not store.has_table(conn, VERSION_TABLE):
+            store.run(VERSION_SCHEMA)
+    rows = store.db.query("migrate", f"SELECT MAX(Version) FROM {VERSION_TABLE}")
+    return rows[0][0] or 0
+
+# apply every migration newer than the database, each in its own transaction
+def migrate(store):
+    version = current_version(store)
+    for number, description, migration in MIGRATIONS:
+        if number <= version:
+            continue
+        print(f"Migrating {store.name} database to version {number}: {description}")
+        with store.db.transaction("migrate") as conn:
+            migration(store, conn)
+            store.run(
+                f"INSERT INTO {VERSION_TABLE} (Version, Description, Applied_At) VALUES (?, ?, ?)",
+                (number, description, datetime.now().replace(microsecond=0)),
+            )
+    return max(version, MIGRATIONS[-1][0])
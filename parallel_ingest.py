@@ -0,0 +1,91 @@
+''' Imports '''
+import importlib.util
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import vault_core
+from metrics import metrics, span
+
+''' Configurations '''
+INGEST_WORKERS = 0  # worker processes parsing and cleaning workbooks, 0 = one less than the CPU count
+PARALLEL_MIN_FILES = 3  # smaller batches import serially, starting workers costs about a second
+# fresh interpreters on every platform: a fork of the window's process could copy a lock
+# another thread holds (metrics, connection timings) and hang the worker
+WORKER_START_METHOD = "spawn"
+
+
+''' Worker Side '''
+# how many worker processes to start for a batch
+def worker_count(workers=None, files=None):
+    workers = INGEST_WORKERS if workers is None else workers
+    if workers <= 0:
+        workers = max(1, (os.cpu_count() or 2) - 1)
+    if files:
+        workers = min(workers, files)
+    return workers
+
+# runs in a worker: parse and clean every sheet, no database access
+# returns the prepared sheets and the timing spans recorded along the way
+def prepare_workbook(file_path):
+    metrics.clear()
+    prepared = vault_core.prepare_sheets(file_path)
+    return prepared, metrics.recent()
+
+# the pool every batch (imports, batch reports) runs its workers in
+def process_pool(workers):
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(WORKER_START_METHOD))
+
+# spawned workers re-import __main__; point them at this module so a GUI script, which
+# builds its window at module level, is not run again in every worker
+def headless_workers():
+    if getattr(sys, "frozen", False):
+        return  # frozen builds rely on multiprocessing.freeze_support() instead
+    main = sys.modules.get("__main__")
+    if main is not None and getattr(main, "__spec__", None) is None:
+        main.__spec__ = importlib.util.find_spec(__name__)
+
+
+''' Writer Side '''
+# parse and clean workbooks in worker processes while this process writes each finished
+# workbook in its own transaction, so Access/SQLite only ever see one writer
+# a failed workbook is rolled back and reported without stopping the rest; returns (rows, failed paths)
+def ingest_files(file_paths, manifest=None, replace=False, notify=None, progress_callback=None, cancel_event=None, workers=None):
+    file_paths = list(file_paths)
+    if manifest is None:
+        manifest = vault_core.load_manifest()
+    workers = worker_count(workers, len(file_paths))
+    total_rows = 0
+    failed = []
+    done = 0
+    start = time.perf_counter()
+
+    with span("parallel ingest", files=len(file_paths), workers=workers) as timing:
+        executor = process_pool(workers)
+        try:
+            futures = {executor.submit(prepare_workbook, path): path for path in file_paths}
+            for future in as_completed(futures):
+                path = futures[future]
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                try:
+                    prepared, spans = future.result()
+                    metrics.extend(spans)
+                    total_rows += vault_core.write_prepared_workbook(path, prepared, manifest, replace, notify, cancel_event=cancel_event)
+                except Exception as e:
+                    print(f"Failed to import {path}: {e}")
+                    failed.append(path)
+
+                done += 1
+                if progress_callback:
+                    progress_callback(done / len(file_paths) * 100)
+        finally:
+            # drop queued workbooks on cancel or error instead of parsing them for nothing
+            executor.shutdown(wait=True, cancel_futures=True)
+        timing["rows"] = total_rows
+
+    elapsed = time.perf_counter() - start
+    rate = total_rows / elapsed if elapsed > 0 else 0
+    print(f"Committed {total_rows} rows from {done} workbooks in {elapsed:.2f}s ({rate:.0f} rows/s, {workers} workers)")
+    return total_rows, failed
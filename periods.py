@@ -0,0 +1,156 @@
+''' Imports '''
+import re
+
+''' Configurations '''
+FISCAL_YEAR_START_MONTH = 10  # FY25 runs Oct 2024 - Sep 2025; 1 makes fiscal years calendar years
+# "Oct 2023 - Mar 2024", "Oct 2023-Mar 2024", "Oct 2023 – Mar 2024", "Oct 2023 to Mar 2024"
+# a text that is one period on its own ("2024-01") is never split
+RANGE_SEPARATOR = re.compile(r"\s*(?:–|—|\bto\b|\bthrough\b|-)\s*", re.IGNORECASE)
+MONTHS = ["january", "february", "march", "april", "may", "june",
+          "july", "august", "september", "october", "november", "december"]
+# spellings found in real timecards, "Feburary" is the template's own February sheet
+MONTH_ALIASES = {"feburary": 2, "febuary": 2, "feburay": 2}
+
+
+''' Period Keys '''
+# month number from "January", "jan", "Sept." or "03"; None when it isn't a month
+def month_number(month):
+    text = str(month or "").replace(" ", "").lower().rstrip(".")
+    if text.isdigit():
+        number = int(text)
+        return number if 1 <= number <= 12 else None
+    if text in MONTH_ALIASES:
+        return MONTH_ALIASES[text]
+    if len(text) >= 3:
+        for number, name in enumerate(MONTHS, start=1):
+            if name.startswith(text):
+                return number
+    return None
+
+# four-digit year from "2024", "2024.0" or "24"; None when it isn't a year
+def year_number(year):
+    text = str(year or "").replace(" ", "")
+    try:
+        number = int(float(text))
+    except ValueError:
+        return None
+    if 0 <= number < 100:
+        number += 2000
+    return number if 1900 <= number <= 2999 else None
+
+# integer YYYYMM the Period column stores, None when month or year can't be read
+def period_key(month, year):
+    month = month_number(month)
+    year = year_number(year)
+    if month is None or year is None:
+        return None
+    return year * 100 + month
+
+# Period n months after (or before) another
+def add_months(period, months):
+    index = (period // 100) * 12 + (period % 100 - 1) + months
+    return (index // 12) * 100 + index % 12 + 1
+
+# "Jan 2024" for 202401
+def period_label(period):
+    if period is None:
+        return "Unknown"
+    return f"{MONTHS[period % 100 - 1][:3].title()} {period // 100}"
+
+
+''' Period Ranges '''
+# (first, last) Period for one period: "2024", "Jan 2024", "2024-01", "Q3 2024", "FY25", "Q1 FY25"
+# None when it isn't one, including text naming two months, quarters or years ("Jan Mar 2024")
+def parse_single_period(text):
+    tokens = re.findall(r"[a-z]+|\d+", str(text).lower())
+    month = quarter = fiscal_year = None
+    numbers = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        following = tokens[i + 1] if i + 1 < len(tokens) else ""
+        if token in ("q", "quarter") and following.isdigit():
+            if quarter is not None:
+                return None
+            quarter = int(following)
+            i += 2
+        elif token == "fy" and following.isdigit():
+            if fiscal_year is not None:
+                return None
+            fiscal_year = year_number(following)
+            i += 2
+        elif token.isdigit():
+            numbers.append(token)
+            i += 1
+        elif month_number(token) is not None:
+            if month is not None:
+                return None
+            month = month_number(token)
+            i += 1
+        else:
+            return None  # not a period word
+
+    # a four-digit number is the year, a short one is the month beside it or a two-digit year
+    year = None
+    long_numbers = [number for number in numbers if len(number) == 4]
+    short_numbers = [number for number in numbers if len(number) < 4]
+    if len(numbers) > 2 or len(long_numbers) > 1 or (month is not None and len(short_numbers) + len(long_numbers) > 1):
+        return None
+    if (fiscal_year is not None and numbers) or (quarter is not None and month is not None):
+        return None
+    if long_numbers:
+        year = year_number(long_numbers[0])
+        if short_numbers and month is None:
+            month = month_number(short_numbers[0])
+    elif len(short_numbers) == 2 and month is None:
+        month = month_number(short_numbers[0])
+        year = year_number(short_numbers[1])
+    elif short_numbers:
+        year = year_number(short_numbers[0])
+
+    if quarter is not None and not 1 <= quarter <= 4:
+        return None
+    if fiscal_year is not None:
+        start = fiscal_year * 100 + FISCAL_YEAR_START_MONTH
+        if FISCAL_YEAR_START_MONTH > 1:
+            start -= 100  # the fiscal year is named for the calendar year it ends in
+        if quarter is not None:
+            start = add_months(start, 3 * (quarter - 1))
+            return start, add_months(start, 2)
+        return start, add_months(start, 11)
+    if year is None:
+        return None
+    if quarter is not None:
+        return year * 100 + 3 * quarter - 2, year * 100 + 3 * quarter
+    if month is not None:
+        return year * 100 + month, year * 100 + month
+    return year * 100 + 1, year * 100 + 12
+
+# (first, last) Period for a period or a range of two, None when the text isn't one
+def parse_period(text):
+    text = str(text or "").strip()
+    if not text:
+        return None
+    single = parse_single_period(text)
+    if single is not None:
+        return single
+    parts = RANGE_SEPARATOR.split(text)
+    if len(parts) != 2:
+        return None
+
+    end = parse_single_period(parts[1])
+    if end is None:
+        return None
+    start = parse_single_period(parts[0])
+    if start is None:
+        # "Oct - Mar 2024": the start borrows the end's year, or the year before it
+        month = month_number(parts[0])
+        if month is None:
+            return None
+        year = end[1] // 100
+        if month > end[1] % 100:
+            year -= 1
+        start = (year * 100 + month, year * 100 + month)
+    if start[0] > end[1]:
+        return None
+    return start[0], end[1]
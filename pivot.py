@@ -0,0 +1,143 @@
+''' Imports '''
+import csv
+from metrics import span
+from periods import month_number, period_key, period_label
+from storage import ENTRY_COLUMNS, contract_key, period_matcher, period_range
+
+''' Configurations '''
+PIVOT_LEVELS = ["Contract_Name", "Period", "Name"]  # contract x period x employee, outermost first
+EMPLOYEE_COLUMNS = ["Name", "Project_Manager"]  # what the innermost level can group by
+LEVEL_HEADINGS = {"Contract_Name": "Contract", "Period": "Period", "Name": "Employee", "Project_Manager": "Project Manager"}
+pd = None  # pandas, imported with the first pivot
+
+
+''' Lazy Imports '''
+def load_pandas():
+    global pd
+    if pd is None:
+        import pandas
+        pd = pandas
+    return pd
+
+
+''' Helpers '''
+# the text a pivot shows for one level's value
+def level_text(column, value):
+    if column == "Period":
+        return period_label(value) if value else "Unknown period"
+    return "" if value is None else str(value)
+
+# ENTRY_COLUMNS rows as a frame with the numeric YYYYMM Period the entries table keeps
+def entries_frame(rows):
+    load_pandas()
+    frame = pd.DataFrame.from_records(rows, columns=ENTRY_COLUMNS)
+    # period_key once per distinct month/year instead of once per row
+    pairs = frame[["Month", "Year"]].drop_duplicates()
+    pairs["Period"] = [period_key(month, year) or 0 for month, year in pairs.itertuples(index=False, name=None)]
+    return frame.merge(pairs, on=["Month", "Year"], how="left")
+
+# the advanced search's exact contract and period filter, applied to whole columns
+def filter_frame(frame, contract=None, month=None, year=None):
+    if contract:
+        keys = frame["Contract_Name"].astype(str).str.replace(" ", "", regex=False).str.lower()
+        frame = frame[keys == contract_key(contract)]
+    bounds = period_range(month, year)
+    if bounds:
+        frame = frame[frame["Period"].between(*bounds)]
+    else:
+        if month and month_number(month) is not None:
+            frame = frame[frame["Period"] % 100 == month_number(month)]
+        elif month:
+            frame = frame[frame["Month"] == month]
+        if year:
+            frame = frame[frame["Year"] == year]
+    return frame
+
+# does an ENTRY_COLUMNS row fall under a pivot node, key being its values from the outermost level down
+# the contract, month and year the pivot was built with apply too, as in filter_frame
+def pivot_matcher(levels, key, contract=None, month=None, year=None):
+    positions = {column: ENTRY_COLUMNS.index(column) for column in levels if column != "Period"}
+    wanted = contract_key(contract) if contract else None
+    in_period = period_matcher(month, year)
+
+    def matches(row):
+        if wanted is not None and contract_key(row[4]) != wanted:
+            return False
+        if not in_period(row):
+            return False
+        for column, value in zip(levels, key):
+            if column == "Period":
+                if (period_key(row[2], row[3]) or 0) != value:
+                    return False
+            elif (row[positions[column]] or "") != value:  # build_pivot groups a missing employee as ""
+                return False
+        return True
+    return matches
+
+
+''' Pivot '''
+# hours and entry counts at every level of the grouping, from one group-by over the entries;
+# the coarser levels are rolled up from the finest one instead of scanning the entries again
+class Pivot:
+    def __init__(self, detail, levels, filters=()):
+        self.levels = levels
+        self.filters = filters  # (contract, month, year) the entries were filtered by
+        self.detail = detail  # one row per full key: levels..., Hours, Entries
+        self.children = {}  # key of a node -> [(value, hours, entries)] one level below it
+        for depth in range(1, len(levels) + 1):
+            grouped = detail.groupby(levels[:depth], sort=True)[["Hours", "Entries"]].sum()
+            for key, hours, entries in grouped.itertuples(name=None):
+                key = key if isinstance(key, tuple) else (key,)
+                self.children.setdefault(key[:-1], []).append((key[-1], float(hours), int(entries)))
+        self.total_hours = float(detail["Hours"].sum())
+        self.entries = int(detail["Entries"].sum())
+
+    # row test for the entries under a node, for drill-down
+    def matcher(self, key):
+        return pivot_matcher(self.levels, key, *self.filters)
+
+    # the nodes directly below key, () for the top level
+    def level(self, key=()):
+        return self.children.get(tuple(key), [])
+
+    def headings(self):
+        return [LEVEL_HEADINGS.get(column, column) for column in self.levels] + ["Hours", "Entries"]
+
+    # one row per finest group, with readable periods, for export
+    def rows(self):
+        return [
+            tuple(level_text(column, value) for column, value in zip(self.levels, row[:-2])) + (round(float(row[-2]), 2), int(row[-1]))
+            for row in self.detail.itertuples(index=False, name=None)
+        ]
+
+# group cached entries by contract x period x employee (or project manager) in one pass
+def build_pivot(rows, contract=None, month=None, year=None, employee="Name"):
+    if employee not in EMPLOYEE_COLUMNS:
+        raise ValueError(f"Can't group by {employee}, use one of {', '.join(EMPLOYEE_COLUMNS)}")
+    levels = PIVOT_LEVELS[:2] + [employee]
+    with span("pivot", rows=len(rows)) as timing:
+        frame = filter_frame(entries_frame(rows), contract, month, year)
+        frame[employee] = frame[employee].fillna("")
+        detail = (
+            frame.groupby(levels, sort=True)
+            .agg(Hours=("Hours", "sum"), Entries=("Hours", "size"))
+            .reset_index()
+        )
+        pivot = Pivot(detail, levels, (contract, month, year))
+        timing["groups"] = len(detail)
+    return pivot
+
+
+''' Export '''
+# .csv for spreadsheets, anything else goes through the PDF report writer; returns the rows written
+def export_pivot(pivot, filename, title="Hours by Contract, Period and Employee"):
+    rows = pivot.rows()
+    if filename.lower().endswith(".csv"):
+        with open(filename, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(pivot.headings())
+            writer.writerows(rows)
+    else:
+        from report_engine import write_report
+        write_report(filename, pivot.headings(), rows, title=title)
+    return len(rows)
@@ -0,0 +1,174 @@
+''' Imports '''
+from itertools import islice
+from metrics import span
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+''' Configurations '''
+REPORT_CHUNK_ROWS = 500  # rows pulled from the result data per step
+PAGE_SIZE = letter
+MARGIN = 50
+ROW_HEIGHT = 12
+CELL_PADDING = 6
+TITLE_FONT = ("Helvetica-Bold", 16)
+SUBTITLE_FONT = ("Helvetica", 12)
+HEADER_FONT = ("Helvetica-Bold", 8)
+BODY_FONT = ("Helvetica", 7)
+FOOTER_FONT = ("Helvetica", 7)
+HOURS_COLUMN = "Hours"
+TOTAL_FORM = "total_hours"  # drawn on page one, defined once the last row is written
+
+
+''' Layout Helpers '''
+def cell_text(value):
+    return "" if value is None else str(value)
+
+# trim text that would spill into the next column
+def fit_text(text, width, font):
+    if stringWidth(text, *font) <= width:
+        return text
+    while text and stringWidth(text + "...", *font) > width:
+        text = text[:-1]
+    return text + "..."
+
+# column widths from the headings and a sample of rows, scaled down to fit the page
+def measure_columns(headings, rows, available_width):
+    widths = [stringWidth(str(heading), *HEADER_FONT) for heading in headings]
+    for row in rows:
+        for i, value in enumerate(row[:len(widths)]):
+            width = stringWidth(cell_text(value), *BODY_FONT)
+            if width > widths[i]:
+                widths[i] = width
+    widths = [width + CELL_PADDING for width in widths]
+
+    total = sum(widths)
+    if total > available_width:
+        scale = available_width / total
+        widths = [width * scale for width in widths]
+    return widths
+
+def format_hours(total_hours):
+    return str(round(total_hours, 2))
+
+
+''' Report Writer '''
+# lays rows out page by page as they arrive
+class ReportWriter:
+    def __init__(self, filename, headings, title="Timecard Report"):
+        self.canvas = canvas.Canvas(filename, pagesize=PAGE_SIZE, pageCompression=1)
+        self.width, self.height = PAGE_SIZE
+        self.headings = [str(heading) for heading in headings]
+        self.title = title
+        self.widths = None
+        self.page = 0
+        self.y = 0
+
+    def start_page(self):
+        c = self.canvas
+        if self.page:
+            self.draw_footer()
+            c.showPage()
+        self.page += 1
+        self.y = self.height - MARGIN
+
+        if self.page == 1:
+            # title block, the total is a form filled in after the last row
+            c.setFont(*TITLE_FONT)
+            c.drawString(MARGIN, self.y, self.title)
+            c.drawRightString(self.width - MARGIN, self.y, "Total Hours Spent:")
+            self.y -= 25
+            c.setFont(*SUBTITLE_FONT)
+            c.drawString(MARGIN, self.y, "Generated by Timecard Vault")
+            c.saveState()
+            c.translate(self.width - MARGIN, self.y)
+            c.doForm(TOTAL_FORM)
+            c.restoreState()
+            self.y -= 45
+
+        # repeat the table headings on every page
+        c.setFont(*HEADER_FONT)
+        x = MARGIN
+        for heading, width in zip(self.headings, self.widths):
+            c.drawString(x, self.y, fit_text(heading, width - CELL_PADDING, HEADER_FONT))
+            x += width
+        c.line(MARGIN, self.y - 3, MARGIN + sum(self.widths), self.y - 3)
+        self.y -= ROW_HEIGHT + 2
+
+    def draw_footer(self):
+        self.canvas.setFont(*FOOTER_FONT)
+        self.canvas.drawRightString(self.width - MARGIN, MARGIN / 2, f"Page {self.page}")
+
+    def write_rows(self, rows):
+        if self.widths is None:
+            self.widths = measure_columns(self.headings, rows, self.width - 2 * MARGIN)
+            self.start_page()
+
+        i = 0
+        while i < len(rows):
+            room = int((self.y - MARGIN) // ROW_HEIGHT) + 1
+            if room <= 0:
+                self.start_page()
+                continue
+            block = rows[i:i + room]
+            self.draw_block(block)
+            self.y -= ROW_HEIGHT * len(block)
+            i += len(block)
+
+    # one text object per column per page instead of a drawString per cell
+    def draw_block(self, rows):
+        c = self.canvas
+        x = MARGIN
+        for col, width in enumerate(self.widths):
+            text = c.beginText(x, self.y)
+            text.setFont(*BODY_FONT)
+            text.setLeading(ROW_HEIGHT)
+            for row in rows:
+                text.textLine(fit_text(cell_text(row[col]), width - CELL_PADDING, BODY_FONT))
+            c.drawText(text)
+            x += width
+
+    def finish(self, total_hours):
+        c = self.canvas
+        if self.widths is None:
+            self.widths = measure_columns(self.headings, [], self.width - 2 * MARGIN)
+            self.start_page()
+        self.draw_footer()
+
+        c.beginForm(TOTAL_FORM)
+        c.setFont(*SUBTITLE_FONT)
+        c.drawRightString(0, 0, format_hours(total_hours))
+        c.endForm()
+        c.save()
+
+
+''' Report Engine '''
+# stream rows into a PDF in chunks, summing hours in the same pass; returns the total
+def write_report(filename, headings, rows, title="Timecard Report", progress_callback=None, chunk_rows=REPORT_CHUNK_ROWS, row_count=None):
+    if row_count is None and hasattr(rows, "__len__"):
+        row_count = len(rows)
+    headings = list(headings)
+    hours_index = headings.index(HOURS_COLUMN) if HOURS_COLUMN in headings else None
+
+    total_hours = 0
+    done = 0
+    iterator = iter(rows)
+
+    with span("pdf render") as timing:
+        writer = ReportWriter(filename, headings, title)
+        while True:
+            chunk = list(islice(iterator, chunk_rows))
+            if not chunk:
+                break
+            if hours_index is not None:
+                total_hours += sum(row[hours_index] or 0 for row in chunk)
+            writer.write_rows(chunk)
+
+            done += len(chunk)
+            timing["rows"] = done
+            if progress_callback and row_count:
+                progress_callback(done / row_count * 100)
+
+        writer.finish(total_hours)
+        timing["pages"] = writer.page
+    return total_hours
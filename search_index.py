@@ -0,0 +1,150 @@
+''' Imports '''
+from collections import OrderedDict, defaultdict
+from storage import ENTRY_COLUMNS
+
+''' Configurations '''
+SEARCH_COLUMNS = ["Contract_Name", "Source_File", "Name", "Month", "Year"]
+GRAM_SIZE = 3  # substring queries at least this long go through the n-gram index
+RESULT_CACHE_SIZE = 64  # recent queries kept by ResultCache
+
+
+''' Helpers '''
+# same cleaning the search box applies: no spaces, case-insensitive
+def normalize(value):
+    if value is None:
+        return ""
+    return str(value).replace(" ", "").lower()
+
+# cache key for a set of column terms, empty terms included so keys line up column for column
+def terms_key(terms):
+    return tuple(sorted((column, normalize(term)) for column, term in terms.items()))
+
+def ngrams(value):
+    return {value[i:i + GRAM_SIZE] for i in range(len(value) - GRAM_SIZE + 1)}
+
+
+# does one row match the same per-column terms the index answers
+def row_matches(row, **terms):
+    for column, term in terms.items():
+        term = normalize(term)
+        if term and term not in normalize(row[ENTRY_COLUMNS.index(column)]):
+            return False
+    return True
+
+
+''' Column Index '''
+# distinct values of one column -> Entry_IDs, plus an n-gram index over those values
+class ColumnIndex:
+    def __init__(self):
+        self.values = {}  # normalized value -> set of Entry_IDs
+        self.grams = defaultdict(set)  # n-gram -> normalized values containing it
+
+    def add(self, value, entry_id):
+        ids = self.values.get(value)
+        if ids is None:
+            ids = self.values[value] = set()
+            for gram in ngrams(value):
+                self.grams[gram].add(value)
+        ids.add(entry_id)
+
+    def remove(self, value, entry_id):
+        ids = self.values.get(value)
+        if not ids:
+            return
+        ids.discard(entry_id)
+        if not ids:
+            del self.values[value]
+            for gram in ngrams(value):
+                values = self.grams.get(gram)
+                if values is not None:
+                    values.discard(value)
+                    if not values:
+                        del self.grams[gram]
+
+    # distinct values containing term as a substring
+    def matching_values(self, term):
+        if len(term) < GRAM_SIZE:
+            # too short for the n-gram index, scan the (small) set of distinct values
+            candidates = self.values.keys()
+        else:
+            gram_sets = [self.grams.get(gram) for gram in ngrams(term)]
+            if any(values is None for values in gram_sets):
+                return []
+            gram_sets.sort(key=len)
+            candidates = set(gram_sets[0]).intersection(*gram_sets[1:])
+        return [value for value in candidates if term in value]
+
+    def lookup(self, term):
+        ids = set()
+        for value in self.matching_values(term):
+            ids |= self.values[value]
+        return ids
+
+
+''' Search Index '''
+# per-column substring index over the cached entries
+class SearchIndex:
+    def __init__(self, columns=SEARCH_COLUMNS):
+        self.positions = {column: ENTRY_COLUMNS.index(column) for column in columns}
+        self.columns = {column: ColumnIndex() for column in columns}
+
+    def add(self, row):
+        for column, position in self.positions.items():
+            self.columns[column].add(normalize(row[position]), row[0])
+
+    def remove(self, row):
+        for column, position in self.positions.items():
+            self.columns[column].remove(normalize(row[position]), row[0])
+
+    def clear(self):
+        self.columns = {column: ColumnIndex() for column in self.positions}
+
+    # Entry_IDs matching every non-empty term, or None when no term narrows the search
+    def search(self, **terms):
+        result = None
+        for column, term in terms.items():
+            term = normalize(term)
+            if not term:
+                continue
+            ids = self.columns[column].lookup(term)
+            result = ids if result is None else result & ids
+            if not result:
+                break
+        return result
+
+
+''' Result Cache '''
+# least-recently-used cache of query results, cleared whenever entries change
+class ResultCache:
+    def __init__(self, size=RESULT_CACHE_SIZE):
+        self.size = size
+        self.items = OrderedDict()
+
+    def get(self, key):
+        value = self.items.get(key)
+        if value is not None:
+            self.items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        while len(self.items) > self.size:
+            self.items.popitem(last=False)
+
+    def clear(self):
+        self.items.clear()
+
+    # smallest cached result for a narrower-or-equal query: every new term extends the cached one
+    def refinable(self, key):
+        best = None
+        for cached_key, rows in self.items.items():
+            if len(cached_key) != len(key) or not any(term for column, term in cached_key):
+                continue
+            if all(
+                cached_column == column and cached_term in term
+                for (cached_column, cached_term), (column, term) in zip(cached_key, key)
+            ):
+                if best is None or len(rows) < len(best):
+                    best = rows
+        return best
@@ -0,0 +1,215 @@
+''' Imports '''
+import glob
+import hashlib
+import importlib.util
+import os
+from metrics import span
+from storage import ENTRY_COLUMNS
+
+''' Configurations '''
+SNAPSHOT_ENABLED = True  # keep a columnar copy of Entries in a local cache for fast startup
+SNAPSHOT_DIR = None  # where snapshots are kept, None for the per-user cache directory (never the shared drive)
+SNAPSHOT_SUFFIX = "_entries.arrow"  # Arrow IPC file, <database name>_<path hash><suffix>
+SNAPSHOT_VERSION = "2"  # bump when the layout changes, older files are ignored and rewritten
+SNAPSHOT_MAX_DELTAS = 8  # change files appended before the next write compacts them into the base file
+DELETED_COLUMN = "Deleted"  # delta files mark deleted Entry_IDs with a row that has only this and Entry_ID set
+TEXT_COLUMNS = ["Name", "Month", "Year", "Contract_Name", "Project_Manager", "Source_File"]
+pa = None  # pyarrow, optional: without it the cache always loads from the database
+
+
+''' Lazy Imports '''
+# whether pyarrow is installed, without paying for the import (it brings numpy along)
+def have_pyarrow():
+    return pa is not None or importlib.util.find_spec("pyarrow") is not None
+
+def load_pyarrow():
+    global pa
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.compute  # noqa: F401
+            import pyarrow.ipc  # noqa: F401
+        except ImportError:
+            return None
+        pa = pyarrow
+    return pa
+
+def snapshot_schema(metadata=None, deltas=False):
+    fields = []
+    for column in ENTRY_COLUMNS:
+        if column == "Entry_ID":
+            fields.append(pa.field(column, pa.int64()))
+        elif column == "Hours":
+            fields.append(pa.field(column, pa.float64()))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    if deltas:
+        fields.append(pa.field(DELETED_COLUMN, pa.bool_()))
+    return pa.schema(fields, metadata=metadata)
+
+# local cache directory: %LOCALAPPDATA% on Windows, $XDG_CACHE_HOME or ~/.cache elsewhere
+def snapshot_dir():
+    if SNAPSHOT_DIR:
+        return SNAPSHOT_DIR
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "TimecardVault", "snapshots")
+
+# the snapshot that belongs to a store's database file, keyed by its full path so
+# databases with the same name in different folders never share one
+def snapshot_path(store):
+    database = os.path.normcase(os.path.abspath(store.path))
+    key = hashlib.sha256(database.encode()).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(database))[0]
+    return os.path.join(snapshot_dir(), f"{name}_{key}{SNAPSHOT_SUFFIX}")
+
+def write_ipc(path, table):
+    temp_path = path + ".tmp"
+    with pa.OSFile(temp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temp_path, path)
+
+
+''' Entry Snapshot '''
+# ENTRY_COLUMNS as Arrow IPC files, memory-mapped on load: a base file plus the deltas appended
+# after it (added rows, and deleted Entry_IDs flagged in DELETED_COLUMN), compacted now and then
+# the metadata records the max Entry_ID and row count each file was written at, so a load can
+# check it against the database and fetch only the rows added since
+# deltas carry the base file's generation, so ones left behind by an interrupted compaction are ignored
+class EntrySnapshot:
+    def __init__(self, path):
+        self.path = path
+
+    @classmethod
+    def for_store(cls, store):
+        if not SNAPSHOT_ENABLED or not have_pyarrow() or not getattr(store, "path", None):
+            return None
+        return cls(snapshot_path(store))
+
+    def delta_paths(self, generation="*"):
+        return sorted(glob.glob(glob.escape(self.path) + f".{generation}.*.delta"))
+
+    def open_table(self, path):
+        table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        return table, table.schema.metadata or {}
+
+    # the mapped base file with every delta applied, and its (max Entry_ID, row count),
+    # or (None, None) when missing or unreadable
+    def read_table(self):
+        if not os.path.exists(self.path):
+            return None, None
+        try:
+            load_pyarrow()
+            table, metadata = self.open_table(self.path)
+            if metadata.get(b"version") != SNAPSHOT_VERSION.encode() or table.column_names != ENTRY_COLUMNS:
+                print(f"Ignoring snapshot {self.path} written by another version")
+                return None, None
+            generation = metadata[b"generation"].decode()
+            tables, deleted = [table.replace_schema_metadata(None)], []
+            for path in self.delta_paths(generation):
+                delta, metadata = self.open_table(path)
+                flags = delta.column(DELETED_COLUMN)
+                deleted.append(delta.filter(flags).column("Entry_ID"))
+                tables.append(delta.filter(pa.compute.invert(flags)).select(ENTRY_COLUMNS).replace_schema_metadata(None))
+            table = pa.concat_tables(tables)
+            deleted = [chunk for ids in deleted for chunk in ids.chunks if len(chunk)]
+            if deleted:
+                ids = pa.concat_arrays(deleted)
+                table = table.filter(pa.compute.invert(pa.compute.is_in(table.column("Entry_ID"), value_set=ids)))
+            return table, (int(metadata[b"max_id"]), int(metadata[b"rows"]))
+        except Exception as e:
+            print(f"Unreadable snapshot {self.path}: {e}")
+            return None, None
+
+    # ENTRY_COLUMNS tuples in Entry_ID order plus (max Entry_ID, row count)
+    def read(self):
+        with span("snapshot read") as timing:
+            table, stamp = self.read_table()
+            if table is None:
+                return None, None
+            columns = [table.column(column).to_pylist() for column in ENTRY_COLUMNS]
+            rows = list(zip(*columns))
+            timing["rows"] = len(rows)
+        return rows, stamp
+
+    # row count straight from the mapped files, no rows are converted
+    def count(self):
+        table, stamp = self.read_table()
+        return None if table is None else table.num_rows
+
+    # {value of column: (total hours, entries)} computed on the mapped table, None without a snapshot
+    def hours_by(self, column="Contract_Name"):
+        table, stamp = self.read_table()
+        if table is None:
+            return None
+        with span("snapshot aggregate", rows=table.num_rows, column=column):
+            grouped = table.group_by(column).aggregate([("Hours", "sum"), ("Hours", "count")])
+            return {
+                value: (hours or 0, count)
+                for value, hours, count in zip(*(grouped.column(name).to_pylist() for name in (column, "Hours_sum", "Hours_count")))
+            }
+
+    # a delta is due, unless there is no base file yet or enough deltas have piled up to compact
+    def needs_rewrite(self):
+        if not os.path.exists(self.path):
+            return True
+        return len(glob.glob(glob.escape(self.path) + ".*.delta")) >= SNAPSHOT_MAX_DELTAS
+
+    # rewrite the base file from the cache's rows under a new generation, then drop the old deltas
+    # written next to it and swapped in so a reader never sees half a file
+    def write(self, rows, max_id):
+        load_pyarrow()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with span("snapshot write", rows=len(rows)):
+            columns = list(zip(*rows)) if rows else [() for _ in ENTRY_COLUMNS]
+            generation = os.urandom(4).hex()
+            metadata = {"version": SNAPSHOT_VERSION, "generation": generation, "max_id": str(max_id), "rows": str(len(rows))}
+            schema = snapshot_schema(metadata)
+            table = pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema,
+            )
+            stale = glob.glob(glob.escape(self.path) + ".*.delta")
+            write_ipc(self.path, table)
+            for path in stale:
+                os.remove(path)
+        return len(rows)
+
+    # append the rows added and Entry_IDs deleted since the last write as one delta file
+    # row_count is the cache's size after the change
+    def append(self, added, deleted, max_id, row_count):
+        load_pyarrow()
+        with span("snapshot append", rows=len(added) + len(deleted)):
+            metadata = self.open_table(self.path)[1]
+            generation = metadata[b"generation"].decode()
+            rows = [(*row, False) for row in added] + [(entry_id,) + (None,) * (len(ENTRY_COLUMNS) - 1) + (True,) for entry_id in deleted]
+            columns = list(zip(*rows)) if rows else [() for _ in range(len(ENTRY_COLUMNS) + 1)]
+            schema = snapshot_schema({"max_id": str(max_id), "rows": str(row_count)}, deltas=True)
+            table = pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema,
+            )
+            sequence = len(self.delta_paths(generation))
+            write_ipc(f"{self.path}.{generation}.{sequence:04d}.delta", table)
+        return len(rows)
+
+    def remove(self):
+        for path in [self.path] + glob.glob(glob.escape(self.path) + ".*.delta"):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+''' Export '''
+# the snapshot as a file for analytics tools: .parquet, or an Arrow IPC copy for anything else
+def export_snapshot(snapshot, out_path):
+    table, stamp = snapshot.read_table()
+    if table is None:
+        raise RuntimeError(f"No snapshot at {snapshot.path}")
+    if out_path.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+        pq.write_table(table, out_path)
+    else:
+        with pa.OSFile(out_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    return table.num_rows
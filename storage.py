@@ -0,0 +1,713 @@
+''' Imports '''
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime
+from periods import month_number, parse_period, period_key
+from metrics import span
+
+# the Access driver is imported on first connect, and only when the Access backend is selected
+pyodbc = None
+
+def load_pyodbc():
+    global pyodbc
+    if pyodbc is None:
+        try:
+            import pyodbc as driver
+        except ImportError:
+            raise RuntimeError("pyodbc is required for the Access backend")
+        pyodbc = driver
+    return pyodbc
+
+''' Configurations '''
+TABLE_NAME = "Entries"
+TOTALS_TABLE = "Entry_Totals"  # Contract_Name x Year x Month -> total hours, row count
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "create_entries_table.sql")
+TOTALS_SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "create_entry_totals_table.sql")
+MANIFEST_TABLE = "Ingest_Manifest"  # content hash, file, sheet and row count of every imported sheet
+MANIFEST_SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "create_ingest_manifest_table.sql")
+CONN_IDLE_CHECK_SECONDS = 60  # ping a pooled connection before reuse if it sat idle this long
+LOAD_CHUNK_ROWS = 5000  # rows fetched per step when streaming the whole table
+DELETE_CHUNK_SIZE = 500  # Entry_IDs per IN (...) list, under SQLite's parameter limit
+MIN_RANGE_SIZE = 16  # contiguous Entry_IDs sent as one BETWEEN instead of an IN list
+IN_LIST_SIZES = (1, 10, 100, DELETE_CHUNK_SIZE)  # IN lists are padded up to one of these lengths
+STATEMENT_CACHE_SIZE = 32  # prepared cursors kept per connection; the least recently used is closed
+ENTRY_COLUMNS = ["Entry_ID", "Name", "Month", "Year", "Contract_Name", "Project_Manager", "Hours", "Source_File"]
+INSERT_COLUMNS = ["Name", "Month", "Year", "Contract_Name", "Project_Manager", "Hours", "Source_File", "Sheet_Name", "Period", "Contract_Key"]
+INSERT_QUERY = f"""
+    INSERT INTO {TABLE_NAME}
+    ({", ".join(INSERT_COLUMNS)})
+    VALUES ({", ".join("?" for _ in INSERT_COLUMNS)})
+    """
+SELECT_ENTRIES = f"""
+    SELECT
+        Entry_ID, [Name], [Month], [Year], Contract_Name, Project_Manager, Hours, Source_File
+    FROM
+        {TABLE_NAME}
+    """
+# Contract_Key and Period follow from the first three, so they only ride along in the group
+TOTALS_GROUP = "Contract_Name, [Year], [Month], Contract_Key, Period"
+SELECT_GROUP_TOTALS = f"""
+    SELECT
+        {TOTALS_GROUP}, SUM(Hours), COUNT(*)
+    FROM
+        {TABLE_NAME}
+    """
+# SQLSTATEs the Access driver reports when the handle or the share went away
+STALE_SQLSTATES = ("08S01", "08003", "08007", "HY000")
+
+
+''' Connection Pool '''
+# keeps one long-lived connection per thread (ODBC and SQLite connections are not shared across threads)
+class ConnectionManager:
+    def __init__(self, connect, ping, is_stale, idle_check_seconds=CONN_IDLE_CHECK_SECONDS):
+        self.connect = connect
+        self.ping = ping
+        self.is_stale = is_stale
+        self.idle_check_seconds = idle_check_seconds
+        self.local = threading.local()
+        self.timings = defaultdict(lambda: deque(maxlen=200))  # operation -> recent acquire times (ms)
+        self.timings_lock = threading.Lock()
+
+    # return this thread's connection, opening or reviving it if needed
+    def acquire(self, operation="query"):
+        start = time.perf_counter()
+        conn = getattr(self.local, "conn", None)
+
+        if conn is not None and time.monotonic() - self.local.last_used > self.idle_check_seconds:
+            if not self.ping(conn):
+                self.discard()
+                conn = None
+
+        if conn is None:
+            conn = self.connect()
+            self.local.conn = conn
+            self.local.statements = OrderedDict()
+            self.local.in_transaction = False
+
+        self.local.last_used = time.monotonic()
+        with self.timings_lock:
+            self.timings[operation].append((time.perf_counter() - start) * 1000)
+        return conn
+
+    # drop this thread's connection so the next acquire reconnects
+    def discard(self):
+        conn = getattr(self.local, "conn", None)
+        self.local.conn = None
+        self.local.statements = OrderedDict()
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    # one cursor per SQL text so the driver keeps the statement prepared between calls,
+    # bounded so one-off SQL (chunked deletes, ad hoc filters) doesn't pile up open cursors
+    def statement(self, sql):
+        statements = self.local.statements
+        cursor = statements.get(sql)
+        if cursor is not None:
+            statements.move_to_end(sql)
+            return cursor
+        cursor = self.local.conn.cursor()
+        statements[sql] = cursor
+        if len(statements) > STATEMENT_CACHE_SIZE:
+            _, evicted = statements.popitem(last=False)
+            try:
+                evicted.close()
+            except Exception:
+                pass
+        return cursor
+
+    # run a read and return all rows, reconnecting once on a stale handle
+    def query(self, operation, sql, params=()):
+        for attempt in range(2):
+            self.acquire(operation)
+            try:
+                with span(f"sql {operation}") as timing:
+                    cursor = self.statement(sql)
+                    cursor.execute(sql, params)
+                    rows = cursor.fetchall()
+                    timing["rows"] = len(rows)
+                if not self.local.in_transaction:
+                    self.local.conn.rollback()  # end the read so the database releases its locks
+                return rows
+            except Exception as e:
+                if attempt == 0 and self.is_stale(e):
+                    print(f"Stale connection during {operation}, reconnecting: {e}")
+                    self.discard()
+                    continue
+                raise
+
+    # commit on success, roll back on error; a dead handle is dropped
+    @contextmanager
+    def transaction(self, operation="write"):
+        conn = self.acquire(operation)
+        self.local.in_transaction = True
+        try:
+            yield conn
+            with span("commit", operation=operation):
+                conn.commit()
+        except Exception as e:
+            if self.is_stale(e):
+                self.discard()
+            else:
+                conn.rollback()
+            raise
+        finally:
+            self.local.in_transaction = False
+
+    # {operation: (count, avg ms, max ms)} of recent connection acquires
+    def acquire_stats(self):
+        with self.timings_lock:
+            return {
+                operation: (len(times), sum(times) / len(times), max(times))
+                for operation, times in self.timings.items() if times
+            }
+
+
+''' Storage Interface '''
+# shared SQL for every backend; subclasses supply the connection hooks
+class Storage:
+    name = "storage"
+    period_month = "Period % 100"  # the month part of Period in this backend's SQL
+
+    def __init__(self):
+        self.db = ConnectionManager(self.connect, self.ping, self.is_stale_error)
+        self.ready_tables = set()  # helper tables known to exist
+        self.tables_lock = threading.Lock()
+
+    # backend hooks
+    def connect(self):
+        raise NotImplementedError
+
+    def ping(self, conn):
+        return True
+
+    def is_stale_error(self, error):
+        return False
+
+    def has_table(self, conn, table):
+        raise NotImplementedError
+
+    def has_column(self, conn, table, column):
+        raise NotImplementedError
+
+    def has_index(self, conn, table, name):
+        raise NotImplementedError
+
+    # cursor used for batch inserts
+    def insert_cursor(self):
+        return self.db.statement(INSERT_QUERY)
+
+    # writes go through one transaction; reads manage their own
+    def transaction(self, operation="write"):
+        # the helper tables must exist before a write starts, creating them commits
+        self.ensure_totals()
+        self.ensure_manifest()
+        return self.db.transaction(operation)
+
+    def acquire_stats(self):
+        return self.db.acquire_stats()
+
+    # run one statement on the current transaction's connection
+    def run(self, sql, params=()):
+        cursor = self.db.statement(sql)
+        cursor.execute(sql, params)
+        return cursor
+
+    # insert a batch of INSERT_COLUMNS tuples inside an open transaction
+    def insert_batch(self, rows):
+        self.insert_cursor().executemany(INSERT_QUERY, rows)
+        self.apply_totals(batch_totals(rows), 1)
+
+    # create and backfill a helper table the first time it is needed
+    def ensure_table(self, table, schema_file, fill):
+        if table in self.ready_tables:
+            return
+        with self.tables_lock:
+            if table in self.ready_tables:
+                return
+            with self.db.transaction("schema") as conn:
+                if not self.has_table(conn, table):
+                    self.run(read_schema(schema_file))
+                    fill()
+            self.ready_tables.add(table)
+
+    # summary table
+    def ensure_totals(self):
+        self.ensure_table(TOTALS_TABLE, TOTALS_SCHEMA_FILE, self.setup_totals)
+
+    def setup_totals(self):
+        self.fill_totals()
+        self.run(f"CREATE INDEX idx_totals_contract_key ON {TOTALS_TABLE} (Contract_Key, Period)")
+
+    # recompute Entry_Totals from Entries with one GROUP BY
+    def rebuild_totals(self):
+        with self.transaction("schema"):
+            self.run(f"DELETE FROM {TOTALS_TABLE}")
+            self.fill_totals()
+
+    def fill_totals(self):
+        self.run(
+            f"""
+            INSERT INTO {TOTALS_TABLE} ({TOTALS_GROUP}, Total_Hours, Row_Count)
+            {SELECT_GROUP_TOTALS}
+            GROUP BY {TOTALS_GROUP}
+            """
+        )
+
+    # grouped hours/count of the entries matching where, read inside the open transaction
+    def group_totals(self, where, params):
+        cursor = self.run(f"{SELECT_GROUP_TOTALS} WHERE {where} GROUP BY {TOTALS_GROUP}", params)
+        return {tuple(row[:5]): [row[5] or 0, row[6]] for row in cursor.fetchall()}
+
+    # add (sign=1) or subtract (sign=-1) grouped totals in the open transaction
+    def apply_totals(self, totals, sign):
+        for group, (hours, count) in totals.items():
+            contract, year, month = group[:3]
+            cursor = self.run(
+                f"""
+                UPDATE {TOTALS_TABLE}
+                SET Total_Hours = Total_Hours + ?, Row_Count = Row_Count + ?
+                WHERE Contract_Name = ? AND [Year] = ? AND [Month] = ?
+                """,
+                (sign * hours, sign * count, contract, year, month),
+            )
+            if cursor.rowcount == 0 and sign > 0:
+                self.run(
+                    f"INSERT INTO {TOTALS_TABLE} ({TOTALS_GROUP}, Total_Hours, Row_Count) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (*group, hours, count),
+                )
+        if sign < 0 and totals:
+            self.run(f"DELETE FROM {TOTALS_TABLE} WHERE Row_Count <= 0")
+
+    # entries as ENTRY_COLUMNS tuples, only those newer than after_id when given
+    def load_entries(self, after_id=0):
+        if after_id:
+            rows = self.db.query("load", f"{SELECT_ENTRIES} WHERE Entry_ID > ? ORDER BY Entry_ID", (after_id,))
+        else:
+            rows = self.db.query("load", f"{SELECT_ENTRIES} ORDER BY Entry_ID")
+        return [tuple(row) for row in rows]
+
+    # every entry in a period (all of them without one) grouped by contract: yields
+    # (Contract_Key, [ENTRY_COLUMNS rows in Entry_ID order]) from a single query
+    # keys limits it to those Contract_Keys, matched on the indexed column
+    def entries_by_contract(self, month=None, year=None, keys=None, chunk_size=LOAD_CHUNK_ROWS):
+        where_clauses, params = period_filter(month, year, self.period_month)
+        if keys:
+            keys = sorted(keys)
+            where_clauses.append(f"Contract_Key IN ({', '.join('?' for _ in keys)})")
+            params.extend(keys)
+        where = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+        conn = self.db.acquire("report")
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"{SELECT_ENTRIES}{where} ORDER BY Contract_Key, Entry_ID", params)
+            key, rows = None, []
+            while True:
+                chunk = cursor.fetchmany(chunk_size)
+                if not chunk:
+                    break
+                for row in chunk:
+                    row_key = contract_key(row[4])
+                    if row_key != key and rows:
+                        yield key, rows
+                        rows = []
+                    key = row_key
+                    rows.append(tuple(row))
+            if rows:
+                yield key, rows
+        finally:
+            cursor.close()
+            if not self.db.local.in_transaction:
+                conn.rollback()
+
+    # (row count, max Entry_ID) of Entries, what a snapshot of the table is checked against
+    def entry_stats(self):
+        count, max_id = self.db.query("stats", f"SELECT COUNT(*), MAX(Entry_ID) FROM {TABLE_NAME}")[0]
+        return count, max_id or 0
+
+    # stream every entry in Entry_ID order, chunk_size rows at a time
+    def iter_entries(self, chunk_size=LOAD_CHUNK_ROWS):
+        conn = self.db.acquire("load")
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"{SELECT_ENTRIES} ORDER BY Entry_ID")
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [tuple(row) for row in rows]
+        finally:
+            cursor.close()
+            if not self.db.local.in_transaction:
+                conn.rollback()
+
+    # entries for a contract, optionally narrowed to a month and/or year
+    # exact matches the normalized Contract_Key instead of a substring of Contract_Name
+    def search(self, contract, month=None, year=None, exact=False):
+        where, params = entry_filter(contract, month, year, exact, self.period_month)
+        rows = self.db.query("search", f"{SELECT_ENTRIES} WHERE {where}", params)
+        return [tuple(row) for row in rows]
+
+    # total hours for a contract, optionally narrowed to a month and/or year, read from Entry_Totals
+    def sum_hours(self, contract, month=None, year=None, exact=False):
+        self.ensure_totals()
+        where, params = entry_filter(contract, month, year, exact, self.period_month)
+        rows = self.db.query(
+            "aggregate",
+            f"""
+            SELECT SUM(Total_Hours)
+            FROM {TOTALS_TABLE}
+            WHERE {where};
+            """,
+            params,
+        )
+        return rows[0][0] or 0
+
+    # [(Period, hours)] for a contract over a month, year or period range, one grouped range query on Entry_Totals
+    def period_hours(self, contract, month=None, year=None, exact=False):
+        self.ensure_totals()
+        where, params = entry_filter(contract, month, year, exact, self.period_month)
+        rows = self.db.query(
+            "aggregate",
+            f"""
+            SELECT Period, SUM(Total_Hours)
+            FROM {TOTALS_TABLE}
+            WHERE {where}
+            GROUP BY Period
+            ORDER BY Period;
+            """,
+            params,
+        )
+        return [(row[0], row[1] or 0) for row in rows]
+
+    # ingest manifest
+    def ensure_manifest(self):
+        self.ensure_table(MANIFEST_TABLE, MANIFEST_SCHEMA_FILE, self.fill_manifest)
+
+    # sheets imported before the manifest existed are listed without a content hash
+    def fill_manifest(self):
+        self.run(
+            f"""
+            INSERT INTO {MANIFEST_TABLE} (Source_File, Sheet_Name, Row_Count)
+            SELECT Source_File, Sheet_Name, COUNT(*) FROM {TABLE_NAME}
+            GROUP BY Source_File, Sheet_Name
+            """
+        )
+
+    # (Content_Hash, Source_File, Sheet_Name) of every imported sheet
+    def load_manifest(self):
+        self.ensure_manifest()
+        rows = self.db.query("manifest", f"SELECT Content_Hash, Source_File, Sheet_Name FROM {MANIFEST_TABLE}")
+        return [tuple(row) for row in rows]
+
+    # note an imported sheet inside the open import transaction
+    def record_ingest(self, content_hash, file_name, sheet_name, row_count):
+        self.run(f"DELETE FROM {MANIFEST_TABLE} WHERE Source_File = ? AND Sheet_Name = ?", (file_name, sheet_name))
+        self.run(
+            f"""
+            INSERT INTO {MANIFEST_TABLE} (Content_Hash, Source_File, Sheet_Name, Row_Count, Imported_At)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (content_hash, file_name, sheet_name, row_count, datetime.now().replace(microsecond=0)),
+        )
+
+    # hash of a sheet listed by fill_manifest, set the first time the sheet is imported again
+    def fill_ingest_hash(self, content_hash, file_name, sheet_name):
+        self.run(
+            f"UPDATE {MANIFEST_TABLE} SET Content_Hash = ? WHERE Source_File = ? AND Sheet_Name = ? AND Content_Hash IS NULL",
+            (content_hash, file_name, sheet_name),
+        )
+
+    # drop manifest rows whose entries have all been deleted, so the sheet can be imported again
+    def prune_manifest(self, sources):
+        for file_name, sheet_name in sources:
+            self.run(
+                f"""
+                DELETE FROM {MANIFEST_TABLE}
+                WHERE Source_File = ? AND Sheet_Name = ?
+                AND NOT EXISTS (SELECT 1 FROM {TABLE_NAME} WHERE Source_File = ? AND Sheet_Name = ?)
+                """,
+                (file_name, sheet_name, file_name, sheet_name),
+            )
+
+    # does any entry come from a file matching this name
+    def file_exists(self, file_name):
+        rows = self.db.query(
+            "file_check",
+            f"""
+            SELECT
+                Source_File
+            FROM
+                {TABLE_NAME}
+            WHERE
+                Source_File LIKE ?;
+            """,
+            (f"%{file_name}%",),
+        )
+        return len(rows) > 0
+
+    # set-based delete of Entry_IDs, in chunks inside one transaction
+    def delete_entries(self, keys):
+        with self.transaction("delete"):
+            totals = {}
+            sources = set()
+            for where, params in id_filters(keys):
+                cursor = self.run(f"SELECT DISTINCT Source_File, Sheet_Name FROM {TABLE_NAME} WHERE {where}", params)
+                sources.update(tuple(row) for row in cursor.fetchall())
+                merge_totals(totals, self.group_totals(where, params))
+                self.run(f"DELETE FROM {TABLE_NAME} WHERE {where}", params)
+            self.apply_totals(totals, -1)
+            self.prune_manifest(sources)
+
+    # (Source_File, Sheet_Name) pairs the given entries came from
+    def entry_sources(self, keys):
+        sources = set()
+        for where, params in id_filters(keys):
+            rows = self.db.query("delete", f"SELECT DISTINCT Source_File, Sheet_Name FROM {TABLE_NAME} WHERE {where}", params)
+            sources.update(tuple(row) for row in rows)
+        return list(sources)
+
+    # delete whole file/sheet uploads in one transaction; returns the deleted Entry_IDs
+    def delete_sheets(self, sources):
+        keys = []
+        with self.transaction("delete"):
+            for file_name, sheet_name in sources:
+                keys.extend(self.remove_file_and_sheet(file_name, sheet_name))
+        return keys
+
+    # returns the deleted Entry_IDs so caches can drop them without a reload
+    def delete_by_file_and_sheet(self, file_name, sheet_name):
+        with self.transaction("delete"):
+            return self.remove_file_and_sheet(file_name, sheet_name)
+
+    # same delete inside the caller's transaction (replacing a changed sheet during an import)
+    def remove_file_and_sheet(self, file_name, sheet_name):
+        where = "Source_File = ? AND Sheet_Name = ?"
+        params = (file_name, sheet_name)
+        cursor = self.run(f"SELECT Entry_ID FROM {TABLE_NAME} WHERE {where}", params)
+        keys = [row[0] for row in cursor.fetchall()]
+
+        totals = self.group_totals(where, params)
+        self.run(f"DELETE FROM {TABLE_NAME} WHERE {where}", params)
+        self.apply_totals(totals, -1)
+        self.run(f"DELETE FROM {MANIFEST_TABLE} WHERE {where}", params)
+        return keys
+
+# WHERE clauses covering a set of Entry_IDs: contiguous runs as BETWEEN, the rest as chunked IN lists
+def id_filters(keys, chunk_size=DELETE_CHUNK_SIZE):
+    filters = []
+    singles = []
+    keys = sorted(set(keys))
+    start = 0
+    for end in range(1, len(keys) + 1):
+        if end < len(keys) and keys[end] == keys[end - 1] + 1:
+            continue
+        if end - start >= MIN_RANGE_SIZE:
+            filters.append(("Entry_ID BETWEEN ? AND ?", (keys[start], keys[end - 1])))
+        else:
+            singles.extend(keys[start:end])
+        start = end
+
+    for i in range(0, len(singles), chunk_size):
+        chunk = singles[i:i + chunk_size]
+        # repeat the last key up to a fixed length so deletes reuse a handful of SQL texts
+        size = next((size for size in IN_LIST_SIZES if len(chunk) <= size <= chunk_size), len(chunk))
+        chunk += [chunk[-1]] * (size - len(chunk))
+        filters.append((f"Entry_ID IN ({', '.join('?' for _ in chunk)})", tuple(chunk)))
+    return filters
+
+# group a batch of INSERT_COLUMNS tuples by contract/year/month
+def batch_totals(rows):
+    totals = {}
+    for name, month, year, contract, manager, hours, source_file, sheet_name, period, key in rows:
+        total = totals.setdefault((contract, year, month, key, period), [0, 0])
+        total[0] += hours
+        total[1] += 1
+    return totals
+
+def merge_totals(totals, more):
+    for key, (hours, count) in more.items():
+        total = totals.setdefault(key, [0, 0])
+        total[0] += hours
+        total[1] += count
+
+# the normalized contract the Contract_Key column stores: no spaces, lower case
+def contract_key(contract):
+    if contract is None:
+        return None
+    return str(contract).replace(" ", "").lower()
+
+# (first, last) Period covered by the month and year boxes, None when the text columns have to be matched instead
+# either box can hold a range or fiscal period: month "Q3" with year "2024", "Oct 2023 - Mar 2024", year "FY25"
+def period_range(month=None, year=None):
+    return parse_period(" ".join(str(part).strip() for part in (month, year) if part))
+
+# build the WHERE clause shared by search and sum_hours (Entries and Entry_Totals share the columns)
+def entry_filter(contract, month=None, year=None, exact=False, period_month=Storage.period_month):
+    if exact:
+        where_clauses = ["Contract_Key = ?"]
+        params = [contract_key(contract)]
+    else:
+        where_clauses = ["Contract_Name LIKE ?"]
+        params = [f"%{contract}%"]
+
+    period_clauses, period_params = period_filter(month, year, period_month)
+    return " AND ".join(where_clauses + period_clauses), params + period_params
+
+# the month/year part of entry_filter as ([clauses], [params]), empty for no period
+# a month without a year matches its number in Period, so "january" and "Jan" find "January"
+def period_filter(month=None, year=None, period_month=Storage.period_month):
+    where_clauses = []
+    params = []
+
+    # indexed equality/range on Period when the month and year can be read
+    bounds = period_range(month, year)
+    if bounds and bounds[0] == bounds[1]:
+        where_clauses.append("Period = ?")
+        params.append(bounds[0])
+    elif bounds:
+        where_clauses.append("Period BETWEEN ? AND ?")
+        params.extend(bounds)
+    else:
+        if month and month_number(month) is not None:
+            where_clauses.append(f"{period_month} = ?")
+            params.append(month_number(month))
+        elif month:
+            where_clauses.append("[Month] = ?")
+            params.append(month)
+
+        if year:
+            where_clauses.append("[Year] = ?")
+            params.append(year)
+
+    return where_clauses, params
+
+# the same exact filter for ENTRY_COLUMNS rows, so trees can take in rows imported after the search
+def entry_matcher(contract, month=None, year=None):
+    key = contract_key(contract)
+    in_period = period_matcher(month, year)
+    return lambda row: contract_key(row[4]) == key and in_period(row)
+
+# the period part of entry_matcher, period_filter for rows
+def period_matcher(month=None, year=None):
+    bounds = period_range(month, year)
+    number = month_number(month) if month else None
+
+    def matches(row):
+        if bounds:
+            period = period_key(row[2], row[3])
+            return period is not None and bounds[0] <= period <= bounds[1]
+        if month and (month_number(row[2]) != number if number is not None else row[2] != month):
+            return False
+        return not year or row[3] == year
+    return matches
+
+
+''' Access Backend '''
+class AccessStorage(Storage):
+    name = "access"
+    period_month = "(Period Mod 100)"
+
+    def __init__(self, path):
+        self.path = path
+        super().__init__()
+
+    def connect(self):
+        driver = load_pyodbc()
+        conn_str = (
+            r"DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};"
+            rf"DBQ={self.path};"
+        )
+        conn = driver.connect(conn_str)
+        conn.autocommit = False
+        return conn
+
+    # cheap metadata call to see if the handle still works
+    def ping(self, conn):
+        try:
+            conn.cursor().tables(table=TABLE_NAME).fetchone()
+            return True
+        except pyodbc.Error:
+            return False
+
+    def is_stale_error(self, error):
+        return (
+            pyodbc is not None
+            and isinstance(error, pyodbc.Error)
+            and bool(error.args)
+            and error.args[0] in STALE_SQLSTATES
+        )
+
+    def has_table(self, conn, table):
+        return conn.cursor().tables(table=table, tableType="TABLE").fetchone() is not None
+
+    def has_column(self, conn, table, column):
+        return conn.cursor().columns(table=table, column=column).fetchone() is not None
+
+    def has_index(self, conn, table, name):
+        return any(row.index_name == name for row in conn.cursor().statistics(table))
+
+    def insert_cursor(self):
+        cursor = self.db.statement(INSERT_QUERY)
+        # bind the whole parameter array in one ODBC call per batch
+        cursor.fast_executemany = True
+        return cursor
+
+
+''' SQLite Backend '''
+class SQLiteStorage(Storage):
+    name = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+        super().__init__()
+        self.create_schema()
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        # readers don't block the import writer and commits skip the full fsync
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def has_table(self, conn, table):
+        cursor = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        return cursor.fetchone() is not None
+
+    def has_column(self, conn, table, column):
+        return any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})"))
+
+    def has_index(self, conn, table, name):
+        cursor = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND name = ?", (table, name))
+        return cursor.fetchone() is not None
+
+    # indexes and later columns come from the migrations
+    def create_schema(self):
+        with self.db.transaction("schema") as conn:
+            conn.execute(sqlite_schema())
+
+# one CREATE TABLE statement from a schema file, without the trailing semicolon
+def read_schema(path):
+    with open(path) as f:
+        return f.read().strip().rstrip(";")
+
+# translate the Access DDL in SCHEMA_FILE to SQLite
+def sqlite_schema():
+    ddl = read_schema(SCHEMA_FILE)
+    ddl = ddl.replace(f"CREATE TABLE {TABLE_NAME}", f"CREATE TABLE IF NOT EXISTS {TABLE_NAME}")
+    return ddl.replace("AUTOINCREMENT PRIMARY KEY", "INTEGER PRIMARY KEY AUTOINCREMENT")
+
+
+''' Backend Selection '''
+def open_storage(backend, path):
+    if backend == "access":
+        return AccessStorage(path)
+    if backend == "sqlite":
+        return SQLiteStorage(path)
+    raise ValueError(f"Unknown storage backend: {backend}")
@@ -0,0 +1,17 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import vault_core  # noqa: E402
+
+
+# a fresh SQLite database for every test, opened through the core like the CLI does
+@pytest.fixture
+def store(tmp_path):
+    vault_core.configure("sqlite", str(tmp_path / "vault.db"))
+    store = vault_core.get_store()
+    yield store
+    store.db.discard()
+    vault_core.configure("sqlite", vault_core.SQLITE_DB)
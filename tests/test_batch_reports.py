@@ -0,0 +1,69 @@
+import csv
+import os
+import threading
+import pytest
+from batch_reports import REPORT_INDEX, report_filename, write_contract_reports
+
+pytest.importorskip("reportlab")
+
+
+def add_entries(store, contracts):
+    rows = [("Ann", "January", "2024", contract, "PM", 8.0, "a.xlsx", "January", 202401, contract.replace(" ", "").lower()) for contract in contracts]
+    with store.transaction("test"):
+        store.insert_batch(rows)
+
+
+def read_index(out_dir):
+    with open(os.path.join(out_dir, REPORT_INDEX), newline="") as f:
+        return {row["Contract"]: row for row in csv.DictReader(f)}
+
+
+def test_report_filename_suffixes_collisions():
+    taken = set()
+    assert report_filename("A.B", taken) == "timecard_report_A_B.pdf"
+    assert report_filename("A,B", taken) == "timecard_report_A_B_2.pdf"
+    assert report_filename("a b", taken) == "timecard_report_a_b_3.pdf"
+
+
+def test_contracts_that_sanitize_alike_get_their_own_files(store, tmp_path):
+    add_entries(store, ["A.B", "A,B"])
+    out_dir = str(tmp_path / "reports")
+    summary = write_contract_reports(out_dir, ["A.B", "A,B", "Missing"], workers=1)
+
+    files = [item[1] for item in summary if item[4] == "ok"]
+    assert len(files) == 2 and len(set(files)) == 2
+    assert all(os.path.exists(os.path.join(out_dir, name)) for name in files)
+    index = read_index(out_dir)
+    assert index["Missing"]["Status"] == "no entries"
+
+
+def test_requested_contracts_are_filtered_in_the_query(store, tmp_path):
+    add_entries(store, ["DHS 1", "DHS 2", "DHS 3"])
+    assert [key for key, rows in store.entries_by_contract(keys=["dhs1", "dhs3"])] == ["dhs1", "dhs3"]
+
+    summary = write_contract_reports(str(tmp_path / "reports"), ["DHS 2"], workers=1)
+    assert [(item[0], item[4]) for item in summary] == [("DHS 2", "ok")]
+
+
+def test_cancel_lists_unreached_contracts_as_cancelled(store, tmp_path):
+    add_entries(store, ["A.B"])
+    cancel_event = threading.Event()
+    cancel_event.set()
+    out_dir = str(tmp_path / "reports")
+    write_contract_reports(out_dir, ["A.B", "Missing"], workers=1, cancel_event=cancel_event)
+
+    assert {contract: row["Status"] for contract, row in read_index(out_dir).items()} == {"A.B": "cancelled", "Missing": "cancelled"}
+
+
+def test_reports_finished_after_a_cancel_stay_in_the_index(store, tmp_path):
+    add_entries(store, [f"C-{i}" for i in range(6)])
+    cancel_event = threading.Event()
+    out_dir = str(tmp_path / "reports")
+    # cancel as soon as the first report is done
+    write_contract_reports(out_dir, workers=1, cancel_event=cancel_event, progress_callback=lambda done, total: done and cancel_event.set())
+
+    index = read_index(out_dir)
+    assert len(index) == 6
+    written = sorted(name for name in os.listdir(out_dir) if name.endswith(".pdf"))
+    assert sorted(row["File"] for row in index.values() if row["Status"] == "ok") == written
+    assert {row["Status"] for row in index.values()} <= {"ok", "cancelled"}
@@ -0,0 +1,26 @@
+from entry_cache import EntryCache
+
+
+def add_entries(store, count):
+    row = ("Ann", "January", "2024", "DHS-0001", "PM", 8.0, "a.xlsx", "January", 202401, "dhs-0001")
+    with store.transaction("test"):
+        store.insert_batch([row] * count)
+    return [entry[0] for entry in store.load_entries()]
+
+
+def test_delete_during_the_streaming_load_is_not_lost(store):
+    keys = add_entries(store, 30)
+    cache = EntryCache(store)
+    iter_entries = store.iter_entries
+
+    # the loader has read every row, then the user deletes some before it finishes
+    def stream():
+        chunks = list(iter_entries())
+        store.delete_entries(keys[:5])
+        assert cache.apply_deletes(keys[:5]) == keys[:5]
+        yield from chunks
+    store.iter_entries = stream
+
+    cache.load()
+    assert sorted(row[0] for row in cache.entries()) == keys[5:]
+    assert not cache.pending_deletes
@@ -0,0 +1,129 @@
+import random
+import sqlite3
+import benchmark
+import vault_core
+import storage
+from storage import SELECT_GROUP_TOTALS, TABLE_NAME, TOTALS_GROUP, TOTALS_TABLE
+
+
+def committed_rows(path):
+    # read from a separate connection so only committed rows count
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {TABLE_NAME}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_multi_sheet_workbook_keeps_every_sheet(store, tmp_path):
+    path = str(tmp_path / "timecard.xlsx")
+    expected = benchmark.write_workbook(path, random.Random(1), "Test Employee", "2024", sheets=4, rows=10)
+
+    assert vault_core.import_workbook(path) == expected
+    assert committed_rows(store.path) == expected
+    assert sorted(row[0] for row in store.db.query("test", f"SELECT DISTINCT Sheet_Name FROM {TABLE_NAME}")) == ["April", "February", "January", "March"]
+
+
+def test_read_inside_transaction_keeps_earlier_inserts(store):
+    row = ["Test Employee", "January", "2024", "DHS-0001", "PM", 8.0, "timecard.xlsx", "January", 202401, "dhs-0001"]
+    with store.transaction("import"):
+        store.insert_batch([tuple(row)])
+        # a duplicate check between sheets must not end the open transaction
+        store.db.query("duplicate check", f"SELECT COUNT(*) FROM {TABLE_NAME}")
+        row[7] = "February"
+        store.insert_batch([tuple(row)])
+
+    assert committed_rows(store.path) == 2
+
+
+def test_unreadable_sheet_is_skipped_and_reported(store, tmp_path, monkeypatch):
+    path = str(tmp_path / "timecard.xlsx")
+    benchmark.write_workbook(path, random.Random(2), "Test Employee", "2024", sheets=3, rows=10)
+    parse_sheet = vault_core.parse_sheet
+
+    def broken_february(xls, sheet_name):
+        if sheet_name == "February":
+            raise ValueError("corrupt sheet")
+        return parse_sheet(xls, sheet_name)
+    monkeypatch.setattr(vault_core, "parse_sheet", broken_february)
+
+    notices = []
+    assert vault_core.import_workbook(path, notify=lambda kind, message: notices.append((kind, message))) == 20
+    assert committed_rows(store.path) == 20
+    assert [kind for kind, message in notices] == ["missing_data"]
+    assert "'February'" in notices[0][1]
+
+
+def test_statement_cache_stays_bounded(store):
+    row = ("Test Employee", "January", "2024", "DHS-0001", "PM", 8.0, "timecard.xlsx", "January", 202401, "dhs-0001")
+    with store.transaction("import"):
+        store.insert_batch([row] * 4000)
+    # every other Entry_ID, so each delete is one IN list of a new length and its own SQL text
+    for count in range(1, 60):
+        keys = [row[0] for row in store.load_entries()][:2 * count:2]
+        store.delete_entries(keys)
+
+    assert len(store.db.local.statements) <= storage.STATEMENT_CACHE_SIZE
+
+
+def test_id_filters_reuse_a_few_in_list_lengths():
+    texts = set()
+    for count in range(1, 120):
+        filters = storage.id_filters(range(0, 2 * count, 2))
+        texts.update(where for where, params in filters)
+        assert sorted(set(key for where, params in filters for key in params)) == list(range(0, 2 * count, 2))
+
+    assert len(texts) == len(storage.IN_LIST_SIZES)
+
+
+def test_import_timecard_writes_one_sheet_once(store, tmp_path):
+    path = str(tmp_path / "timecard.xlsx")
+    benchmark.write_workbook(path, random.Random(3), "Test Employee", "2024", sheets=2, rows=10)
+
+    assert vault_core.import_timecard(path, sheet_name="February") == 10
+    assert vault_core.import_timecard(path, sheet_name="February") == 0
+    assert committed_rows(store.path) == 10
+
+
+def test_sheet_listed_without_a_hash_is_backfilled_not_replaced(store, tmp_path):
+    path = str(tmp_path / "timecard.xlsx")
+    expected = benchmark.write_workbook(path, random.Random(4), "Test Employee", "2024", sheets=2, rows=10)
+    vault_core.import_workbook(path)
+    # as fill_manifest lists sheets imported before the manifest existed
+    with store.transaction("test"):
+        store.run("UPDATE Ingest_Manifest SET Content_Hash = NULL")
+
+    assert vault_core.import_workbook(path, replace=True) == 0
+    assert committed_rows(store.path) == expected
+    assert all(row[0] for row in store.load_manifest())
+
+
+def totals_match(store):
+    # Entry_Totals must always equal a GROUP BY over Entries
+    entries = store.db.query("test", f"SELECT SUM(Hours), COUNT(*) FROM {TABLE_NAME}")[0]
+    totals = store.db.query("test", f"SELECT SUM(Total_Hours), SUM(Row_Count) FROM {TOTALS_TABLE}")[0]
+    grouped = store.db.query("test", f"{SELECT_GROUP_TOTALS} GROUP BY {TOTALS_GROUP}")
+    table = store.db.query("test", f"SELECT {TOTALS_GROUP}, Total_Hours, Row_Count FROM {TOTALS_TABLE}")
+    rounded = lambda rows: sorted((*row[:5], round(row[5] or 0, 6), row[6]) for row in rows)
+    return (round(entries[0] or 0, 6), entries[1]) == (round(totals[0] or 0, 6), totals[1] or 0) and rounded(grouped) == rounded(table)
+
+
+def test_totals_follow_inserts_deletes_and_replaces(store, tmp_path):
+    store.ensure_totals()
+    path = str(tmp_path / "timecard.xlsx")
+    benchmark.write_workbook(path, random.Random(7), "Test Employee", "2024", sheets=3, rows=20)
+
+    vault_core.import_workbook(path)
+    assert totals_match(store)
+
+    store.delete_entries([row[0] for row in store.load_entries()][::3])
+    assert totals_match(store)
+
+    store.delete_by_file_and_sheet("timecard.xlsx", "January")
+    assert totals_match(store)
+
+    # same file and sheets with new content, imported with replace
+    benchmark.write_workbook(path, random.Random(8), "Test Employee", "2024", sheets=3, rows=15)
+    assert vault_core.import_workbook(path, replace=True) == 45
+    assert totals_match(store)
+    assert committed_rows(store.path) == 45
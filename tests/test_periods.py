@@ -0,0 +1,53 @@
+import pytest
+from periods import month_number, parse_period
+
+
+@pytest.mark.parametrize("text, expected", [
+    # single periods
+    ("2024", (202401, 202412)),
+    ("Jan 2024", (202401, 202401)),
+    ("Feburary 2024", (202402, 202402)),
+    ("2024-01", (202401, 202401)),
+    ("01/2024", (202401, 202401)),
+    ("3 2024", (202403, 202403)),
+    # ranges
+    ("Oct 2023 - Mar 2024", (202310, 202403)),
+    ("Oct 2023-Mar 2024", (202310, 202403)),
+    ("Oct 2023 – Mar 2024", (202310, 202403)),
+    ("Oct 2023 to Mar 2024", (202310, 202403)),
+    ("Oct - Mar 2024", (202310, 202403)),
+    ("Oct-Mar 2024", (202310, 202403)),
+    ("2023-2024", (202301, 202412)),
+    # quarters and fiscal years (FY25 runs Oct 2024 - Sep 2025)
+    ("Q3 2024", (202407, 202409)),
+    ("FY25", (202410, 202509)),
+    ("Q1 FY25", (202410, 202412)),
+    ("Q3 FY2025", (202504, 202506)),
+    # ambiguous or not a period
+    ("Jan Mar 2024", None),
+    ("Oct 2023 Mar 2024", None),
+    ("Q1 Q2 2024", None),
+    ("Q1 Jan 2024", None),
+    ("2023 2024", None),
+    ("FY24 2024", None),
+    ("1 2 2024", None),
+    ("Mar 2024 - Jan 2024", None),
+    ("Q5 2024", None),
+    ("january", None),
+    ("", None),
+])
+def test_parse_period(text, expected):
+    assert parse_period(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("January", 1),
+    ("jan", 1),
+    ("Sept.", 9),
+    ("03", 3),
+    ("Feburary", 2),
+    ("13", None),
+    ("ju", None),
+])
+def test_month_number(text, expected):
+    assert month_number(text) == expected
@@ -0,0 +1,37 @@
+import pytest
+from pivot import build_pivot
+
+pytest.importorskip("pandas")
+
+# ENTRY_COLUMNS rows: Entry_ID, Name, Month, Year, Contract_Name, Project_Manager, Hours, Source_File
+ROWS = [
+    (1, "Ann", "January", "2020", "DHS-0002", "PM", 8.0, "a.xlsx"),
+    (2, "Bob", "Feburary", "2020", "DHS-0002", None, 4.0, "b.xlsx"),
+    (3, "Ann", "January", "2021", "DHS-0002", "PM", 16.0, "a.xlsx"),
+    (4, "Ann", "March", "2020", "VA-0007", "PM", 2.5, "a.xlsx"),
+]
+
+
+def drilled(pivot, key):
+    matches = pivot.matcher(key)
+    return [row for row in ROWS if matches(row)]
+
+
+@pytest.mark.parametrize("filters", [(None, None, None), (None, None, "2020"), ("DHS-0002", "Jan", None), (None, "Q1 2020", None)])
+@pytest.mark.parametrize("employee", ["Name", "Project_Manager"])
+def test_drill_down_matches_node_totals(filters, employee):
+    pivot = build_pivot(ROWS, *filters, employee=employee)
+
+    def check(key):
+        for value, hours, entries in pivot.level(key):
+            rows = drilled(pivot, key + (value,))
+            assert (len(rows), sum(row[6] for row in rows)) == (entries, hours)
+            if len(key) + 1 < len(pivot.levels):
+                check(key + (value,))
+    check(())
+
+
+def test_year_filter_limits_contract_drill_down():
+    pivot = build_pivot(ROWS, year="2020")
+    assert pivot.level() == [("DHS-0002", 12.0, 2), ("VA-0007", 2.5, 1)]
+    assert [row[0] for row in drilled(pivot, ("DHS-0002",))] == [1, 2]
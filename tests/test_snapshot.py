@@ -0,0 +1,62 @@
+import glob
+import os
+import pytest
+import snapshot
+from entry_cache import EntryCache
+from snapshot import SNAPSHOT_MAX_DELTAS, EntrySnapshot
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, "SNAPSHOT_DIR", str(tmp_path / "cache"))
+    return str(tmp_path / "cache")
+
+
+def add_entries(store, contract, count):
+    row = ("Ann", "January", "2024", contract, "PM", 8.0, "a.xlsx", "January", 202401, contract.lower())
+    with store.transaction("test"):
+        store.insert_batch([row] * count)
+
+
+def deltas(snap):
+    return glob.glob(glob.escape(snap.path) + ".*.delta")
+
+
+def test_snapshot_lives_in_the_local_cache(store, snapshot_dir):
+    snap = EntrySnapshot.for_store(store)
+    assert os.path.dirname(snap.path) == snapshot_dir
+    assert os.path.dirname(store.path) != snapshot_dir
+
+
+def test_changes_are_appended_as_deltas_and_compacted(store, snapshot_dir):
+    add_entries(store, "DHS-1", 20)
+    snap = EntrySnapshot.for_store(store)
+    cache = EntryCache(store, snap)
+    cache.load()
+    assert cache.save_snapshot() == 20
+    base_written = os.path.getmtime(snap.path)
+
+    # one import and one delete: a small delta, the base file stays as it is
+    add_entries(store, "DHS-2", 5)
+    cache.sync()
+    keys = [row[0] for row in cache.entries()][:3]
+    store.delete_entries(keys)
+    cache.apply_deletes(keys)
+    assert cache.save_snapshot() == 8
+    assert len(deltas(snap)) == 1 and os.path.getmtime(snap.path) == base_written
+
+    # a fresh cache starts from base plus delta and agrees with the database
+    warm = EntryCache(store, snap)
+    assert sorted(warm.load()) == sorted(store.load_entries())
+    assert not warm.snapshot_full  # loaded from the snapshot, not from the database
+    assert snap.count() == 22
+    assert snap.hours_by("Contract_Name") == {"DHS-1": (136.0, 17), "DHS-2": (40.0, 5)}
+
+    for step in range(SNAPSHOT_MAX_DELTAS):
+        add_entries(store, "DHS-3", 1)
+        cache.sync()
+        cache.save_snapshot()
+    assert len(deltas(snap)) < SNAPSHOT_MAX_DELTAS
+    assert sorted(EntryCache(store, snap).load()) == sorted(store.load_entries())
@@ -0,0 +1,38 @@
+import random
+import benchmark
+import vault_core
+from watch_folder import WATCH_MAX_RETRIES, FolderWatcher
+
+
+def test_failed_write_is_retried_on_the_next_poll(store, tmp_path, monkeypatch):
+    drop = tmp_path / "drop"
+    drop.mkdir()
+    expected = benchmark.write_workbook(str(drop / "timecard.xlsx"), random.Random(5), "Test Employee", "2024", sheets=2, rows=10)
+    watcher = FolderWatcher(str(drop), settle=0).load_checkpoint()
+
+    write_prepared_sheets = vault_core.write_prepared_sheets
+    def database_busy(*args, **kwargs):
+        raise RuntimeError("database is locked")
+    monkeypatch.setattr(vault_core, "write_prepared_sheets", database_busy)
+    assert watcher.poll() == 0
+    assert len(watcher.pending) == 1 and not watcher.checkpoint
+
+    monkeypatch.setattr(vault_core, "write_prepared_sheets", write_prepared_sheets)
+    assert watcher.poll() == expected
+    assert not watcher.pending
+
+
+def test_write_that_keeps_failing_is_checkpointed(store, tmp_path, monkeypatch):
+    drop = tmp_path / "drop"
+    drop.mkdir()
+    benchmark.write_workbook(str(drop / "timecard.xlsx"), random.Random(6), "Test Employee", "2024", sheets=1, rows=10)
+    watcher = FolderWatcher(str(drop), settle=0).load_checkpoint()
+
+    def database_busy(*args, **kwargs):
+        raise RuntimeError("database is locked")
+    monkeypatch.setattr(vault_core, "write_prepared_sheets", database_busy)
+    for attempt in range(WATCH_MAX_RETRIES):
+        watcher.poll()
+
+    assert not watcher.pending
+    assert [entry["error"] for entry in watcher.checkpoint.values()] == ["database is locked"]
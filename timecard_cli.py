@@ -0,0 +1,258 @@
+''' Imports '''
+import argparse
+import os
+import re
+import sys
+import time
+import traceback
+import multiprocessing
+import vault_core
+from parallel_ingest import ingest_files, PARALLEL_MIN_FILES
+from watch_folder import FolderWatcher, WATCH_CHECKPOINT, WATCH_INTERVAL_SECONDS, WATCH_SETTLE_SECONDS
+
+''' Exit Codes '''
+EXIT_OK = 0
+EXIT_FAILED = 1  # at least one workbook or report failed
+EXIT_USAGE = 2  # bad arguments (argparse exits with this too)
+EXIT_STORAGE = 3  # the database could not be opened
+
+
+''' Commands '''
+# import every workbook in a directory through the same bulk path as the GUI
+def cmd_ingest(args):
+    if not os.path.isdir(args.directory):
+        print(f"Not a directory: {args.directory}", file=sys.stderr)
+        return EXIT_USAGE
+
+    paths = vault_core.find_workbooks(args.directory, args.recursive)
+    if not paths:
+        print(f"No workbooks found in {args.directory}")
+        return EXIT_OK
+
+    start = time.perf_counter()
+    total_rows = 0
+    failed = []
+    manifest = vault_core.load_manifest()
+    if args.workers != 1 and len(paths) >= PARALLEL_MIN_FILES:
+        # parse and clean in worker processes, this process stays the only writer
+        total_rows, failed = ingest_files(paths, manifest, args.replace, notify=print_notice, workers=args.workers)
+        for file_path in failed:
+            print(f"Failed: {file_path}", file=sys.stderr)
+    else:
+        for file_path in paths:
+            try:
+                total_rows += vault_core.import_workbook(file_path, notify=print_notice, manifest=manifest, replace=args.replace)
+            except Exception as e:
+                failed.append(file_path)
+                print(f"Failed: {file_path}: {e}", file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    rate = total_rows / elapsed if elapsed > 0 else 0
+    print(f"Ingested {total_rows} rows from {len(paths) - len(failed)}/{len(paths)} workbooks in {elapsed:.2f}s ({rate:.0f} rows/s)")
+    return EXIT_FAILED if failed else EXIT_OK
+
+# poll a drop folder and import new or changed workbooks until interrupted
+def cmd_watch(args):
+    if not os.path.isdir(args.directory):
+        print(f"Not a directory: {args.directory}", file=sys.stderr)
+        return EXIT_USAGE
+
+    watcher = FolderWatcher(args.directory, args.checkpoint, args.recursive, replace=not args.no_replace, notify=print_notice,
+                            interval=args.interval, settle=0 if args.once else args.settle)
+    if args.once:
+        # one pass over the folder, e.g. from a scheduled task
+        watcher.load_checkpoint()
+        watcher.scan()
+        while watcher.pending:
+            watcher.process(watcher.ready())
+    else:
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            pass
+    status = watcher.status
+    latency = "-" if status["max_latency_s"] is None else f"{status['max_latency_s']}s"
+    print(f"Watched {args.directory}: {status['files']} workbooks, {status['rows']} rows in {status['batches']} batches, "
+          f"{status['failed']} failed, backlog {status['backlog']}, max latency {latency}")
+    return EXIT_FAILED if status["failed"] else EXIT_OK
+
+# bring the columnar Entries snapshot up to date, optionally exporting it for analytics
+def cmd_snapshot(args):
+    from entry_cache import EntryCache
+    from snapshot import EntrySnapshot, export_snapshot
+
+    store = vault_core.get_store()
+    snapshot = EntrySnapshot.for_store(store)
+    if snapshot is None:
+        print("Snapshots need pyarrow (pip install pyarrow) and SNAPSHOT_ENABLED in snapshot.py", file=sys.stderr)
+        return EXIT_FAILED
+    if args.rebuild:
+        snapshot.remove()
+
+    start = time.perf_counter()
+    cache = EntryCache(store, snapshot)
+    cache.load()
+    written = cache.save_snapshot()
+    elapsed = time.perf_counter() - start
+    print(f"Snapshot {snapshot.path}: {len(cache)} rows to Entry_ID {cache.last_seen_max}, {'rewritten' if written else 'up to date'} in {elapsed:.2f}s")
+
+    if args.export:
+        rows = export_snapshot(snapshot, args.export)
+        print(f"Exported {rows} rows to {args.export}")
+    if args.summary:
+        # summed on the mapped columns, no rows are read back into Python
+        for contract, (hours, count) in sorted(snapshot.hours_by("Contract_Name").items(), key=lambda item: str(item[0])):
+            print(f"{contract}\t{round(hours, 2)}\t{count}")
+    return EXIT_OK
+
+# hours by contract, period and employee for every contract (or one), printed or exported
+def cmd_pivot(args):
+    from entry_cache import EntryCache
+    from pivot import build_pivot, export_pivot
+    from snapshot import EntrySnapshot
+
+    store = vault_core.get_store()
+    cache = EntryCache(store, EntrySnapshot.for_store(store))
+    start = time.perf_counter()
+    pivot = build_pivot(cache.load(), args.contract, args.month, args.year, employee=args.by)
+    cache.save_snapshot()
+    elapsed = time.perf_counter() - start
+
+    if args.out:
+        count = export_pivot(pivot, args.out)
+        print(f"Wrote {args.out}: {count} rows, {round(pivot.total_hours, 2)} hours in {elapsed:.2f}s")
+    else:
+        print("\t".join(pivot.headings()))
+        for row in pivot.rows():
+            print("\t".join(str(value) for value in row))
+        print(f"Total\t\t\t{round(pivot.total_hours, 2)}\t{pivot.entries}")
+    return EXIT_OK
+
+# one PDF per contract plus an index, rendered in worker processes
+def cmd_reports(args):
+    from batch_reports import write_contract_reports, REPORT_INDEX
+
+    contracts = args.contract or None
+    summary = write_contract_reports(args.out_dir, contracts, args.month, args.year, workers=args.workers)
+    failed = [item for item in summary if item[4].startswith("failed")]
+    print(f"Index: {os.path.join(args.out_dir, REPORT_INDEX)} ({len(summary) - len(failed)} contracts, {len(failed)} failed)")
+    return EXIT_FAILED if failed else EXIT_OK
+
+def cmd_totals(args):
+    if args.by_period:
+        from periods import period_label
+        subtotals = vault_core.contract_period_hours(args.contract, args.month, args.year)
+        for period, hours in subtotals:
+            print(f"{args.contract}\t{period_label(period)}\t{hours}")
+        total_hours = sum(hours for period, hours in subtotals)
+    else:
+        total_hours = vault_core.contract_totals(args.contract, args.month, args.year)
+    print(f"{args.contract}\t{total_hours}")
+    return EXIT_OK
+
+def cmd_report(args):
+    filename = args.out
+    if not filename:
+        contract_name = re.sub(r'[^\w\-]', '_', args.contract.strip())
+        filename = f"timecard_report_{contract_name}.pdf"
+
+    start = time.perf_counter()
+    row_count, total_hours = vault_core.contract_report(args.contract, filename, args.month, args.year)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {filename}: {row_count} rows, {total_hours} hours in {elapsed:.2f}s")
+    return EXIT_OK
+
+# duplicate and missing-data warnings go to stderr instead of popups
+def print_notice(kind, message):
+    if kind == "deleted":
+        message = f"{len(message)} replaced entries removed"
+    print(f"{kind}: {message}".replace("\n", " "), file=sys.stderr)
+
+
+''' Argument Parsing '''
+def build_parser():
+    parser = argparse.ArgumentParser(prog="timecard-vault", description="Timecard Vault without the window: batch ingest and reporting.")
+    parser.add_argument("--backend", choices=["access", "sqlite"], help="storage backend (default: STORAGE_BACKEND in vault_core.py)")
+    parser.add_argument("--db", help="database file for the chosen backend")
+    parser.add_argument("--metrics", help="write per-phase timings to this JSON lines file when done")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="import every .xls* timecard in a directory")
+    ingest.add_argument("directory")
+    ingest.add_argument("--recursive", action="store_true", help="also import workbooks in subdirectories")
+    ingest.add_argument("--replace", action="store_true", help="replace sheets whose content changed since they were imported")
+    ingest.add_argument("--workers", type=int, help="worker processes parsing workbooks (default: INGEST_WORKERS in parallel_ingest.py, 1 = import serially)")
+    ingest.set_defaults(func=cmd_ingest)
+
+    watch = commands.add_parser("watch", help="import new or changed .xls* timecards dropped into a directory")
+    watch.add_argument("directory")
+    watch.add_argument("--recursive", action="store_true", help="also watch subdirectories")
+    watch.add_argument("--interval", type=float, default=WATCH_INTERVAL_SECONDS, help="seconds between scans")
+    watch.add_argument("--settle", type=float, default=WATCH_SETTLE_SECONDS, help="seconds without changes before a batch is imported")
+    watch.add_argument("--checkpoint", help=f"checkpoint file (default: {WATCH_CHECKPOINT} in the directory)")
+    watch.add_argument("--no-replace", action="store_true", help="skip changed sheets instead of replacing them")
+    watch.add_argument("--once", action="store_true", help="import what is there now and exit")
+    watch.set_defaults(func=cmd_watch)
+
+    snapshot = commands.add_parser("snapshot", help="refresh the columnar Entries snapshot (needs pyarrow)")
+    snapshot.add_argument("--rebuild", action="store_true", help="discard the snapshot and rebuild it from the database")
+    snapshot.add_argument("--export", help="also copy it to this file, .parquet for Parquet, anything else for Arrow IPC")
+    snapshot.add_argument("--summary", action="store_true", help="print hours and entries per contract from the snapshot")
+    snapshot.set_defaults(func=cmd_snapshot)
+
+    totals = commands.add_parser("totals", help="print total hours for a contract")
+    totals.add_argument("--contract", required=True)
+    totals.add_argument("--month", help="month, or a period such as Q3 or \"Oct 2023 - Mar 2024\"")
+    totals.add_argument("--year", help="year, or a fiscal year such as FY25")
+    totals.add_argument("--by-period", action="store_true", help="also print the hours of each month in the range")
+    totals.set_defaults(func=cmd_totals)
+
+    pivot = commands.add_parser("pivot", help="hours by contract, period and employee")
+    pivot.add_argument("--contract", help="one contract (default: all)")
+    pivot.add_argument("--month", help="month, or a period such as Q3 or \"Oct 2023 - Mar 2024\"")
+    pivot.add_argument("--year", help="year, or a fiscal year such as FY25")
+    pivot.add_argument("--by", choices=["Name", "Project_Manager"], default="Name", help="innermost grouping")
+    pivot.add_argument("--out", help="write to a .csv (or .pdf) instead of printing")
+    pivot.set_defaults(func=cmd_pivot)
+
+    report = commands.add_parser("report", help="write a contract's entries to a PDF")
+    report.add_argument("--contract", required=True)
+    report.add_argument("--month")
+    report.add_argument("--year")
+    report.add_argument("--out", help="PDF path (default: timecard_report_<contract>.pdf)")
+    report.set_defaults(func=cmd_report)
+
+    reports = commands.add_parser("reports", help="write a PDF per contract and an index file into a directory")
+    reports.add_argument("--out-dir", required=True)
+    reports.add_argument("--contract", action="append", help="contract to include, repeatable (default: every contract with entries in the period)")
+    reports.add_argument("--month", help="month, or a period such as Q3 or \"Oct 2023 - Mar 2024\"")
+    reports.add_argument("--year", help="year, or a fiscal year such as FY25")
+    reports.add_argument("--workers", type=int, help="worker processes (default: REPORT_WORKERS in batch_reports.py)")
+    reports.set_defaults(func=cmd_reports)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    vault_core.configure(args.backend, args.db)
+
+    try:
+        vault_core.get_store()
+    except Exception as e:
+        print(f"Could not open the database: {e}", file=sys.stderr)
+        return EXIT_STORAGE
+
+    try:
+        return args.func(args)
+    except Exception as e:
+        print(f"{args.command} failed: {e}", file=sys.stderr)
+        traceback.print_exc()
+        return EXIT_FAILED
+    finally:
+        if args.metrics:
+            from metrics import metrics
+            metrics.export_jsonl(args.metrics)
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
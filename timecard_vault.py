@@ -1,148 +1,67 @@
 ''' Imports '''
-import pandas as pd
-import pyodbc
+import time
+STARTUP_T0 = time.perf_counter()  # startup timing starts before any other import
 import os
 import platform
 import traceback
 import re
+import queue
+import threading
+import multiprocessing
 from tkinter import *
 from tkinter import filedialog
 from tkinter.ttk import *
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from vault_core import get_store, import_workbook, load_manifest
+from parallel_ingest import ingest_files, headless_workers, PARALLEL_MIN_FILES
+from watch_folder import FolderWatcher
+from entry_cache import EntryCache
+from snapshot import EntrySnapshot
+from batch_reports import write_contract_reports, REPORT_INDEX
+from pivot import build_pivot, export_pivot, level_text, EMPLOYEE_COLUMNS, LEVEL_HEADINGS
+from search_index import row_matches, terms_key, ResultCache
+from storage import entry_matcher
+from periods import period_label
+from virtual_tree import VirtualTreeview
+from metrics import metrics, span
 
 ''' Configurations '''
-ACCESS_DB = r"file path"
-TABLE_NAME = "Entries"
 active_treeviews = []
 PDF_contract = ""
 LAST_TOTAL_HOURS = 0  # will hold the latest calculated value for PDF use
+UI_POLL_MS = 100  # how often the Tk loop drains messages from the import worker
+SEARCH_DEBOUNCE_MS = 250  # wait this long after the last keystroke before searching
+DIAGNOSTICS_REFRESH_MS = 1000  # how often an open Diagnostics window re-reads the metrics
+WATCH_STATUS_MS = 1000  # how often the watch folder status line is redrawn
+SNAPSHOT_SAVE_DELAY_MS = 3000  # the Entries snapshot is rewritten once changes stop for this long
+startup_marks = []  # (phase, seconds since the previous mark)
 
 
 
-''' Connect to Access '''
-def get_conn():
-    conn_str = (
-        r"DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};"
-        rf"DBQ={ACCESS_DB};"
-    )
-    return pyodbc.connect(conn_str)
+''' Startup Timing '''
+# record how long each startup phase took since the previous mark
+def mark_startup(phase):
+    now = time.perf_counter()
+    previous = STARTUP_T0 + sum(seconds for _, seconds in startup_marks)
+    startup_marks.append((phase, now - previous))
+    metrics.record(f"startup {phase}", now - previous)
 
+def report_startup():
+    breakdown = " | ".join(f"{phase} {seconds:.2f}s" for phase, seconds in startup_marks)
+    total = sum(seconds for _, seconds in startup_marks)
+    print(f"Startup {total:.2f}s: {breakdown}")
 
-''' Clean and Upload Data '''
-def import_timecard(file_path, sheet_name=None, progress_callback=None):
-    # Skip sheets named 'example' (case-insensitive)
-    if sheet_name and sheet_name.strip().lower() == "example":
-        print(f"Skipping sheet named 'example' in {file_path}")
-        return
+# import workers must not open a second window: frozen builds exit here in the worker,
+# script runs import parallel_ingest as the worker's main module instead of this file
+multiprocessing.freeze_support()
+headless_workers()
+mark_startup("imports")
 
-    try:
-        df = pd.read_excel(file_path, sheet_name=sheet_name)  # Correct: uses specified sheet
-        file_name = os.path.basename(file_path)
-        file_name = file_name.replace(" ", "")
-        
-        # before upload check for duplicate file
-        if duplicate_file(file_name, sheet_name):
-            print(f"Duplicate: {file_name} | {sheet_name} — skipping")
-            show_duplicate_warning(f"Duplicate: {file_name} ({sheet_name})")
-            return
-        
-        if not duplicate_file(file_name, sheet_name):
-            try:
-                # clean column names
-                df.columns = df.columns.str.strip()
-                df["Totals"] = pd.to_numeric(df["Totals"], errors="coerce")
-                df = df.dropna(subset=["Totals"])
-
-                # select and rename relevant columns
-                df = df[["Name", "Month", "Year", "Contract Name", "Project Manager", "Totals"]]
-                df.columns = ["Name", "Month", "Year", "Contract_Name", "Project_Manager", "Hours"]
-
-                # remove spaces from data
-                df["Month"] = df["Month"].astype(str).str.replace(" ", "", regex=False)
-                df["Contract_Name"] = df["Contract_Name"].astype(str).str.replace(" ", "", regex=False)
-                df["Project_Manager"] = df["Project_Manager"].astype(str).str.replace(" ", "", regex=False)
-                df["Hours"] = df["Hours"].astype(str).str.replace(" ", "", regex=False)
-
-                # fill down Name, Month, and Year from the first non-empty cell
-                # check if values exist
-                try:
-                    df["Name"] = df["Name"].dropna().iloc[0]
-                    df["Month"] = df["Month"].dropna().iloc[0]
-                    df["Year"] = df["Year"].dropna().iloc[0]
-                except IndexError:
-                    print(f"Skipping sheet '{sheet_name}' in '{file_path}' — missing Name/Month/Year")
-
-                    # popup UI warning
-                    popup = Toplevel()
-                    popup.title("Missing Data Warning")
-                    popup.geometry("400x100+150+150")
-                    Label(popup, text=f"'{sheet_name}' in {os.path.basename(file_path)}\nis missing Name, Month, or Year.\nSheet skipped.", justify="center", wraplength=380).pack(pady=10)
-    
-                    return
-                
-                # remove 0s from total hours
-                df["Hours"] = pd.to_numeric(df["Hours"], errors="coerce")
-                df = df[df["Hours"] > 0]
-
-                # Remove rows where Contract_Name is NaN
-                df = df.dropna(subset=["Contract_Name"])
-
-                # Remove rows where Contract_Name is blank or just whitespace
-                df["Contract_Name"] = df["Contract_Name"].astype(str).str.strip()
-                df = df[df["Contract_Name"] != ""]
-
-
-                # add filename source
-                path = file_path.replace(" ", "")
-                df["Source_File"] = os.path.basename(path)
-                df["Sheet_Name"] = sheet_name
-
-                # upload to Access
-                conn = get_conn()
-                cursor = conn.cursor()
-                row_count = len(df)
-
-                for i, (_, row) in enumerate(df.iterrows()):
-                    val = str(row.Contract_Name).strip().lower()
-                    if pd.isna(row.Contract_Name) or val == "" or val == "nan":
-                        print(f"Skipping row with missing or invalid contract in sheet '{sheet_name}'")
-                        continue
-
-                    cursor.execute(
-                        f"""
-                        INSERT INTO {TABLE_NAME}
-                        (Name, Month, Year, Contract_Name, Project_Manager, Hours, Source_File, Sheet_Name)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-
-                        """,
-                        row.Name, row.Month, row.Year,
-                        row.Contract_Name, row.Project_Manager,
-                        row.Hours, row.Source_File, row.Sheet_Name
-
-                    )
-
-                    # update progress
-                    if progress_callback:
-                        percent = ((i + 1) / row_count) * 100
-                        progress_callback(percent)
-
-                conn.commit()
-                conn.close()
-                print(f"Imported: {file_path} | Sheet: {sheet_name}")
 
-            except Exception as e:
-                print(f"Error processing {file_path} | Sheet: {sheet_name}: {e}")
-                traceback.print_exc()
-        else:
-            show_duplicate_warning()
-            return
-
-        if progress_callback:
-            progress_callback(100)
-
-    except Exception as e:
-        print(f"Failed to import {file_path} (sheet: {sheet_name}): {e}")
+''' Connect to Storage '''
+# the database is opened by the load thread, so an unreachable share is reported in the window
+entry_cache = EntryCache(None)  # every tree, search and report reads from this one copy
+search_cache = ResultCache()  # terms -> matching rows
+hours_cache = ResultCache()  # (contract, month, year, exact) -> total hours
 
 
 ''' TKINTER UI '''
@@ -165,6 +84,8 @@ fram1.pack(pady=20)
 # second middle
 fram1_5 = Frame(root)
 fram1_5.pack(pady=10)
+fram1_75 = Frame(root)
+fram1_75.pack()
 # bottom
 fram2 = Frame(root)
 fram2.pack(pady=10)
@@ -177,12 +98,33 @@ progress = Progressbar(fram_14, orient = HORIZONTAL,
 # upload not success label
 duplicate_label = Label(fram_14, text='Error: Duplicate file, upload unsuccessful.')
 print_error_label = Label(fram_14, text='Print error.')
+# PDF export progress
+report_label = Label(fram_14, text='')
+# initial data load progress
+loading_label = Label(fram_14, text='Loading entries...')
+loading_label.pack(side=LEFT)
+# cancel a running upload
+cancel_butt = Button(fram_14, text='Cancel Upload')
+# watch folder backlog and latency
+watch_label = Label(fram_14, text='')
 # upload button
 ubutt = Button(fram, text='Upload Timecard', padding=10)
 ubutt.pack(side=LEFT)
+# swap in changed sheets instead of skipping them
+replace_var = BooleanVar(value=False)
+Checkbutton(fram, text='Replace changed sheets', variable=replace_var).pack(side=LEFT, padx=10)
+# import new timecards dropped into a folder
+watch_butt = Button(fram, text='Watch Folder')
+watch_butt.pack(side=LEFT)
 # delete timecard button
 dbutt = Button(root, text='Delete Timecard Entry')
 dbutt.place(x=0, y=0) 
+# where the time goes
+diag_butt = Button(root, text='Diagnostics')
+diag_butt.place(relx=0.0, rely=1.0, anchor='sw')
+# one PDF per contract
+batch_butt = Button(root, text='Batch Reports')
+batch_butt.place(relx=1.0, rely=1.0, anchor='se')
 
 
 # searching
@@ -203,18 +145,31 @@ sbutt.pack(side=LEFT)
 # advanced search
 asbutt = Button(fram1, text='Advanced Search')
 asbutt.pack(side=RIGHT)
+# hours of every contract by period and employee
+pivbutt = Button(fram1, text='Pivot')
+pivbutt.pack(side=RIGHT)
 # total hours display
 hours_label = Label(fram1_5, text="Total Hours: " + str(LAST_TOTAL_HOURS))
 hours_label.pack(side=LEFT, padx=10)
+# how many of the matching rows are loaded into the tree
+count_label = Label(fram1_5, text="")
+count_label.pack(side=LEFT, padx=10)
+# per-period hours when the advanced search covers a range
+subtotals_label = Label(fram1_75, text="", wraplength=700, justify="center")
+subtotals_label.pack()
 
 
 # search results treeview 
 # to display results
-results_tree = Treeview(root, columns=("Entry_ID","Name", "Month", "Year", "Contract_Name", "Project_Manager", "Hours", "Source_File"), show="headings")
+fram3 = Frame(root)
+fram3.pack(fill=BOTH, expand=True, pady=20)
+results_scroll = Scrollbar(fram3, orient=VERTICAL)
+results_scroll.pack(side=RIGHT, fill=Y)
+results_tree = VirtualTreeview(fram3, counter=count_label, scrollbar=results_scroll, columns=("Entry_ID","Name", "Month", "Year", "Contract_Name", "Project_Manager", "Hours", "Source_File"), show="headings")
 for col in results_tree["columns"]:
     results_tree.heading(col, text=col)
     results_tree.column(col, width=100)
-results_tree.pack(fill=BOTH, expand=True, pady=20)
+results_tree.pack(side=LEFT, fill=BOTH, expand=True)
 active_treeviews.append(results_tree)
 # print treeview
 pbutt= Button(root, text='Print')
@@ -226,68 +181,149 @@ pbutt.place(relx = 1.0,
 ''' Functions to Make Buttons Work '''
 # treeview functions
 # loading data into tree
-def load_all_data():
+# opens the database on the first call; returns the error that stopped the load, None once loaded
+def load_all_data(on_chunk=None):
     try:
-        conn = get_conn()
-        cursor = conn.cursor()
-        cursor.execute(
-            f"""
-            SELECT
-                Entry_ID, [Name], [Month], [Year], Contract_Name, Project_Manager, Hours, Source_File
-            FROM
-                {TABLE_NAME}
-            """
-        )
-        rows = cursor.fetchall()
-        conn.close()
-        return [tuple(row) for row in rows]
+        if entry_cache.store is None:
+            with span("storage open"):
+                store = get_store()
+            entry_cache.store = store
+            entry_cache.snapshot = EntrySnapshot.for_store(store)
+        entry_cache.load(on_chunk)
+    except Exception as e:
+        print("Failed to load data from the database.")
+        traceback.print_exc()
+        return e
+    return None
+
+# first load runs on a worker so the window appears immediately
+# retry marks a load started again after the first one failed
+load_thread = None
+def start_initial_load(retry=False):
+    global load_thread
+    def run():
+        error = load_all_data(on_chunk=lambda count: post_ui("load_progress", count))
+        post_ui("load_done", (retry, error))
+    load_thread = threading.Thread(target=run, name="initial-load", daemon=True)
+    load_thread.start()
+
+# pick up entries added since the last load, returns just the new rows
+def sync_entries():
+    if not entry_cache.loaded:
+        # a running load will pick these rows up, a failed one is started again
+        if not load_thread.is_alive():
+            start_initial_load(retry=True)
+        return []
+    try:
+        return entry_cache.sync()
     except Exception as e:
-        print("Failed to load data from Access.")
+        print(f"Failed to sync data from {entry_cache.store.name}.")
         traceback.print_exc()
         return []
-    
+
+# write the snapshot off the Tk thread once a burst of changes is over
+snapshot_after = None
+def save_snapshot_soon():
+    global snapshot_after
+    if entry_cache.snapshot is None:
+        return
+    if snapshot_after is not None:
+        root.after_cancel(snapshot_after)
+    snapshot_after = root.after(SNAPSHOT_SAVE_DELAY_MS, lambda: threading.Thread(target=entry_cache.save_snapshot, name="snapshot-write", daemon=True).start())
+
 # create the tree
-def populate_tree(tree, data):
-    # clear the tree first
-    for row in tree.get_children():
-        tree.delete(row)
-    # insert new data
-    for row_data in data:
-        tree.insert('', 'end', values=row_data)
+# terms is the tree's active filter ({} shows everything, None keeps new rows out)
+# row_filter replaces terms for searches the index doesn't answer
+def populate_tree(tree, data, terms=None, row_filter=None):
+    if row_filter is None and terms is not None:
+        row_filter = lambda row: row_matches(row, **terms)
+    # the tree clears itself and only inserts the first page
+    with span("tree populate", rows=len(data)):
+        tree.set_rows(data, row_filter)
 
 # refresh data
-def refresh_all_trees():
-    global main_tree_data
-    main_tree_data = load_all_data()
+# apply one change set (new rows, deleted Entry_IDs) to every open tree, keeping its filter
+def refresh_all_trees(inserted=(), deleted=()):
+    # cached results and totals are stale once entries change
+    search_cache.clear()
+    hours_cache.clear()
+    save_snapshot_soon()
 
     for tree in active_treeviews[:]:  # copy to avoid mutation issues
         try:
-            if str(tree) in tree.tk.call("winfo", "children", "."):
-                populate_tree(tree, main_tree_data)
+            if tree.winfo_exists():
+                tree.apply_changes(inserted, deleted)
             else:
                 active_treeviews.remove(tree)  # clean up invalid tree
         except Exception as e:
             print(f"Treeview refresh error: {e}")
             active_treeviews.remove(tree)
 
-# search functions
-# search contract name in Access
-def search(search_text, tree, header, full_data):
-    cleaned_search_term = search_text.strip().replace(" ", "").lower()
-
-    # clear the tree
-    for row in tree.get_children():
-        tree.delete(row)
+# start every open tree over from rows through its own filter, e.g. once the streaming load is done
+def reset_all_trees(rows):
+    # results computed while the load was streaming only saw part of the entries
+    search_cache.clear()
+    hours_cache.clear()
 
-    if cleaned_search_term == "":
-        populate_tree(tree, full_data)
-        return
+    for tree in active_treeviews[:]:
+        try:
+            if not tree.winfo_exists():
+                active_treeviews.remove(tree)
+            elif tree.row_filter is not None:
+                populate_tree(tree, [row for row in rows if tree.row_filter(row)], row_filter=tree.row_filter)
+        except Exception as e:
+            print(f"Treeview reset error: {e}")
+            active_treeviews.remove(tree)
 
-    filtered_data = [
-        row for row in full_data
-        if cleaned_search_term in str(row).lower()
-    ]
-    populate_tree(tree, filtered_data)
+# search functions
+# rows matching the terms, from the result cache, by refining an earlier result, or from the index
+def find_entries(terms):
+    with span("search filter") as timing:
+        key = terms_key(terms)
+        rows = search_cache.get(key)
+        timing["source"] = "cache"
+        if rows is None:
+            previous = search_cache.refinable(key)
+            if previous is not None:
+                timing["source"] = "refine"
+                rows = [row for row in previous if row_matches(row, **terms)]
+            else:
+                timing["source"] = "index"
+                rows = entry_cache.search(**terms)
+            search_cache.put(key, rows)
+        timing["rows"] = len(rows)
+    return rows
+
+# search one column (header) of the cached entries through the index
+def search(search_text, tree, header):
+    terms = {header: search_text}
+    filtered_data = find_entries(terms)
+    populate_tree(tree, filtered_data, terms)
+
+# total hours from the summary table, memoized until the next import or delete
+def cached_sum_hours(contract, month=None, year=None, exact=False):
+    key = (contract, month or "", year or "", exact)
+    total_hours = hours_cache.get(key)
+    if total_hours is None:
+        total_hours = get_store().sum_hours(contract, month, year, exact)
+        hours_cache.put(key, total_hours)
+    return total_hours
+
+# [(Period, hours)] for the advanced search, memoized like cached_sum_hours
+def cached_period_hours(contract, month=None, year=None):
+    key = ("periods", contract, month or "", year or "")
+    subtotals = hours_cache.get(key)
+    if subtotals is None:
+        subtotals = get_store().period_hours(contract, month, year, exact=True)
+        hours_cache.put(key, subtotals)
+    return subtotals
+
+def show_subtotals(subtotals):
+    if len(subtotals) > 1:
+        text = "   ".join(f"{period_label(period)}: {round(hours, 2)}" for period, hours in subtotals)
+    else:
+        text = ""
+    subtotals_label.configure(text=text)
 
 # calculate the total hours
 def calculate_hours(search_term):
@@ -302,25 +338,7 @@ def calculate_hours(search_term):
         return
 
     try:
-        total_hours = 0
-        conn = get_conn()
-        cursor = conn.cursor()
-        cursor.execute(
-            f"""
-            SELECT
-                Hours
-            FROM
-                {TABLE_NAME}
-            WHERE
-                Contract_Name LIKE ?;
-            """,
-            f"%{cleaned_search_term}%",
-        )
-        rows = cursor.fetchall()
-        # calculation
-        for (hours,) in rows:
-            total_hours += hours
-        conn.close()
+        total_hours = cached_sum_hours(cleaned_search_term)
 
         LAST_TOTAL_HOURS = total_hours
         hours_label.configure(text=f"Total Hours: " + str(total_hours))
@@ -333,10 +351,24 @@ def calculate_hours(search_term):
 
 # combines search and calculate functions
 def search_and_calculate(event=None):
-    search(edit.get(), results_tree, "Contract_Name", main_tree_data)
+    global search_after_id
+    search_after_id = None
+    search(edit.get(), results_tree, "Contract_Name")
     calculate_hours(edit.get())
+    show_subtotals([])
+
+# live search: restart the debounce timer on every keystroke
+search_after_id = None
+def on_search_key(event=None):
+    global search_after_id
+    if event is not None and event.keysym == "Return":
+        return  # Return already searched
+    if search_after_id is not None:
+        root.after_cancel(search_after_id)
+    search_after_id = root.after(SEARCH_DEBOUNCE_MS, search_and_calculate)
 
 # calculate hours from the advanced search
+# month/year may be a range or fiscal period; the total comes with per-period subtotals from one query
 def advanced_calculate_hours(search_term, month=None, year=None):
     global LAST_TOTAL_HOURS
 
@@ -344,46 +376,24 @@ def advanced_calculate_hours(search_term, month=None, year=None):
     if not search_term:
         total_hours = 0
         hours_label.configure(text="Total Hours: " + str(total_hours))
+        show_subtotals([])
         return
 
     cleaned_search_term = search_term.replace(" ", "")
     total_hours = 0
 
     try:
-        total_hours = 0
-        conn = get_conn()
-        cursor = conn.cursor()
-
-        # build WHERE conditions and parameter list dynamically
-        where_clauses = ["Contract_Name LIKE ?"]
-        params = [f"%{cleaned_search_term}%"]
-
-        if month:
-            where_clauses.append("Month = ?")
-            params.append(month)
+        subtotals = cached_period_hours(cleaned_search_term, month, year)
+        total_hours = sum(hours for period, hours in subtotals)
 
-        if year:
-            where_clauses.append("[Year] = ?")
-            params.append(year)
-
-        query = f"""
-            SELECT [Hours]
-            FROM {TABLE_NAME}
-            WHERE {" AND ".join(where_clauses)};
-        """
-
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        for (hours,) in rows:
-            total_hours += hours
-
-        conn.close()
         LAST_TOTAL_HOURS = total_hours
         hours_label.configure(text=f"Total Hours: " + str(total_hours))
+        show_subtotals(subtotals)
         return total_hours
 
     except Exception as e:
         hours_label.configure(text="Total Hours: Error")
+        show_subtotals([])
         traceback.print_exc()
 
 # advanced search helper
@@ -393,12 +403,12 @@ def on_advanced_search(contract, month, year):
 
 # clear search results
 def clear(tree):
-    if tree and tree.get_children():
-        for item in tree.get_children():
-            tree.delete(item)
+    if tree:
+        tree.clear()
     edit.delete(0, END)  # clear text in entry
     total_hours = 0
     hours_label.configure(text="Total Hours: " + str(total_hours)) # clear the calculated hours
+    show_subtotals([])
     edit.focus_set()
 cbutt.config(command=lambda: clear(results_tree))
 
@@ -407,7 +417,7 @@ def advanced_search():
     # create the popup
     popup = Toplevel()
     popup.title("Advanced Search")
-    popup.geometry("600x150+100+50") # Width x Height + X_offset + Y_offset
+    popup.geometry("600x190+100+50") # Width x Height + X_offset + Y_offset
 
     # frames
     pfram1 = Frame(popup)
@@ -425,8 +435,8 @@ def advanced_search():
     #set focus
     contract.focus_set()
     contract.bind("<Return>", lambda event: on_advanced_search(contract.get(), month.get(), year.get()))
-    # month
-    Label(pfram1, text='Month:').pack(side=LEFT)
+    # month, or a period such as Q3 or "Oct 2023 - Mar 2024"
+    Label(pfram1, text='Month / Period:').pack(side=LEFT)
     month = Entry(pfram1) 
     month.pack(side=LEFT, fill=BOTH, expand=1) 
     month.bind("<Return>", lambda event: on_advanced_search(contract.get(), month.get(), year.get()))
@@ -435,6 +445,7 @@ def advanced_search():
     year = Entry(pfram1) 
     year.pack(side=LEFT, fill=BOTH, expand=1) 
     year.bind("<Return>", lambda event: on_advanced_search(contract.get(), month.get(), year.get()))
+    Label(pfram3, text='Periods: Jan 2024, Q3 2024, Oct 2023 - Mar 2024, FY25').pack()
     # search button
     assbutt = Button(pfram2, text='Search')  
     assbutt.pack(side=BOTTOM) 
@@ -447,29 +458,26 @@ def advanced_search():
     advanced_calculate_hours(edit.get(), month.get(), year.get())
 
 # detect when advanced search is pressed
+# the whole contract name, matched on the indexed Contract_Key and Period columns
 def advanced_search_button_press(contract, month, year):
     cleaned_contract = contract.strip().replace(" ", "").lower()
-    cleaned_month = month.strip().replace(" ", "").lower()
-    cleaned_year = year.strip().replace(" ", "").lower()
+    # spaces stay in the period, "Q3 2024" and "Oct 2023 - Mar 2024" are read the same way the totals read them
+    cleaned_month = month.strip()
+    cleaned_year = year.strip()
 
     filtered_data = []
+    row_filter = None
+
+    # a contract is required, month and year only narrow it
+    if cleaned_contract:
+        try:
+            filtered_data = get_store().search(cleaned_contract, cleaned_month or None, cleaned_year or None, exact=True)
+            row_filter = entry_matcher(cleaned_contract, cleaned_month or None, cleaned_year or None)
+        except Exception as e:
+            print(f"Advanced search failed: {e}")
+            traceback.print_exc()
 
-    for row in main_tree_data:
-        row_str = str(row).lower().replace(" ", "")
-        if cleaned_contract and cleaned_month and cleaned_year:
-            if cleaned_contract in row_str and cleaned_month in row_str and cleaned_year in row_str:
-                filtered_data.append(row)
-        elif cleaned_contract and cleaned_month:
-            if cleaned_contract in row_str and cleaned_month in row_str:
-                filtered_data.append(row)
-        elif cleaned_contract and cleaned_year:
-            if cleaned_contract in row_str and cleaned_year in row_str:
-                filtered_data.append(row)
-        elif cleaned_contract:
-            if cleaned_contract in row_str:
-                filtered_data.append(row)
-
-    populate_tree(results_tree, filtered_data)
+    populate_tree(results_tree, filtered_data, row_filter=row_filter)
 
 # combine advanced_search_button_press and return_contract functions
 def assbutt_press_and_return_contract_name(contract,month, year):
@@ -483,10 +491,9 @@ def return_contract(contract):
 
 
 # upload an excel file
-# progress bar update
+# progress bar update, called from the import worker thread
 def update_progress(percent):
-    progress['value'] = percent
-    root.update_idletasks()
+    post_ui("progress", percent)
 
 # import files
 def import_multiple_files():
@@ -501,53 +508,179 @@ def import_multiple_files():
     # error
     if not file_paths:
         return
-    
-    # import file with progress update
-    def run_import():
-        for file_path in file_paths:
-            file_name = os.path.basename(file_path)
-
-            progress.pack(padx=20, pady=10, side=LEFT) 
 
-            try:
-                xls = pd.ExcelFile(file_path)
-                for sheet_name in xls.sheet_names:
-                    progress['value'] = 0
-                    root.update_idletasks()
+    # hand the files to the worker so the window stays responsive
+    cancel_event = threading.Event()
+    import_cancel_events.append(cancel_event)
+    progress['value'] = 0
+    progress.pack(padx=20, pady=10, side=LEFT)
+    cancel_butt.pack(side=LEFT)
+    start_import_worker()
+    import_jobs.put((file_paths, cancel_event, replace_var.get()))
+
+# import file with progress update
+def run_import(file_paths, cancel_event, replace=False):
+    # one manifest load per batch, every duplicate check after that is in memory
+    manifest = load_manifest()
+    if len(file_paths) >= PARALLEL_MIN_FILES:
+        # workbooks are parsed in worker processes, progress moves per finished file
+        ingest_files(file_paths, manifest, replace, notify=post_ui, progress_callback=update_progress, cancel_event=cancel_event)
+        return
+    for file_path in file_paths:
+        if cancel_event.is_set():
+            break
+        try:
+            import_workbook(file_path, progress_callback=update_progress, cancel_event=cancel_event, notify=post_ui, manifest=manifest, replace=replace)
+            update_progress(100)
+        except Exception as e:
+            print(f"Error processing {file_path}: {e}")
+
+# background import worker
+import_jobs = queue.Queue()  # (file_paths, cancel_event, replace) waiting to be imported
+ui_queue = queue.Queue()  # (kind, payload) messages for the Tk loop
+import_cancel_events = []  # cancel flags of queued and running jobs, touched only by the Tk thread
+import_thread = None
+import_lock = threading.Lock()  # uploads and the folder watcher write one at a time
+
+def start_import_worker():
+    global import_thread
+    if import_thread is None or not import_thread.is_alive():
+        import_thread = threading.Thread(target=import_worker_loop, name="import-worker", daemon=True)
+        import_thread.start()
+
+def import_worker_loop():
+    while True:
+        file_paths, cancel_event, replace = import_jobs.get()
+        try:
+            with import_lock:
+                run_import(file_paths, cancel_event, replace)
+        except Exception:
+            traceback.print_exc()
+        finally:
+            post_ui("import_done", cancel_event)
+
+# send a message to the Tk loop from any thread
+def post_ui(kind, payload=None):
+    ui_queue.put((kind, payload))
+
+# drain worker messages on the Tk thread
+def poll_ui_queue():
+    try:
+        while True:
+            kind, payload = ui_queue.get_nowait()
+            handle_ui_message(kind, payload)
+    except queue.Empty:
+        pass
+    root.after(UI_POLL_MS, poll_ui_queue)
+
+def handle_ui_message(kind, payload):
+    if kind == "progress":
+        progress['value'] = payload
+    elif kind == "duplicate":
+        show_duplicate_warning(payload)
+    elif kind == "missing_data":
+        show_missing_data_warning(payload)
+    elif kind == "replaced":
+        show_duplicate_warning(payload)
+    elif kind == "deleted":
+        # old rows of replaced sheets, committed with the import
+        refresh_all_trees(deleted=entry_cache.apply_deletes(payload))
+    elif kind == "load_progress":
+        loading_label.config(text=f"Loading entries... {payload}")
+    elif kind == "load_done":
+        # (retried, the error that stopped the load or None)
+        retry, error = payload
+        # trees filled while the load streamed (or before it failed) are set again, never appended to
+        reset_all_trees(entry_cache.entries())
+        if not retry:
+            # a failed load is timed under its own name so it never counts as a data load
+            mark_startup("data load" if entry_cache.loaded else "data load failed")
+            report_startup()
+        if entry_cache.loaded:
+            loading_label.pack_forget()
+            # rows committed while the load was streaming
+            refresh_all_trees(inserted=sync_entries())
+        else:
+            loading_label.config(text=f'Could not load entries ({error}), retrying after the next change.')
+    elif kind == "report_progress":
+        report_label.config(text=f"Exporting PDF: {payload:.0f}%")
+    elif kind == "report_done":
+        report_label.pack_forget()
+        if os.path.exists(payload):
+            print_pdf(payload)
+        else:
+            print(f"Error: File not found at {payload}")
+    elif kind == "report_failed":
+        report_label.pack_forget()
+        print_error_label.pack(side=RIGHT)
+    elif kind == "call":
+        # (callback, result) from a worker whose window handles the result itself
+        callback, result = payload
+        callback(result)
+    elif kind == "watch_batch":
+        refresh_all_trees(inserted=sync_entries())
+    elif kind == "import_done":
+        if payload in import_cancel_events:
+            import_cancel_events.remove(payload)
+        if not import_cancel_events:
+            progress.pack_forget()
+            cancel_butt.pack_forget()
+        refresh_all_trees(inserted=sync_entries())
+
+# stop the running upload and drop queued ones
+def cancel_imports():
+    for cancel_event in import_cancel_events:
+        cancel_event.set()
+
+# watch folder
+watcher = None
+
+# start watching a drop folder, or stop the running watcher
+def toggle_watch():
+    global watcher
+    if watcher is not None:
+        watcher.stop()
+        watcher = None
+        watch_butt.config(text='Watch Folder')
+        watch_label.pack_forget()
+        return
 
-                    import_timecard(file_path, sheet_name=sheet_name, progress_callback=update_progress)
+    directory = filedialog.askdirectory(title="Select Timecard Drop Folder")
+    if not directory:
+        return
+    watcher = FolderWatcher(directory, notify=watch_notice, on_batch=lambda status: post_ui("watch_batch", status), lock=import_lock).start()
+    watch_butt.config(text='Stop Watching')
+    watch_label.pack(side=LEFT, padx=10)
+    show_watch_status(watcher)
+
+# unattended imports print their warnings instead of opening popups
+def watch_notice(kind, message):
+    if kind == "deleted":
+        post_ui(kind, message)
+    else:
+        print(f"Watch {kind}: {message}")
 
-                    progress['value'] = 100
-                    root.update_idletasks()
-            except Exception as e:
-                print(f"Error processing {file_path}: {e}")
-        progress.pack_forget()
-        refresh_all_trees()
-
-    # shows the progress bar for an extra second so user is able to see it
-    root.after(100, run_import)
-
-# duplicate file check
-def duplicate_file(file_name, sheet_name):
-    conn = get_conn()
-    cursor = conn.cursor()
-    cursor.execute(
-        f"""
-        SELECT COUNT(*) FROM {TABLE_NAME}
-        WHERE Source_File = ? AND Sheet_Name = ?
-        """,
-        (file_name, sheet_name),
-    )
-    count = cursor.fetchone()[0]
-    conn.close()
-    return count > 0
+# redraw loop of one watcher, it ends when that watcher is stopped
+def show_watch_status(current):
+    if watcher is not current:
+        return
+    status = current.status
+    latency = "-" if status["last_latency_s"] is None else f"{status['last_latency_s']}s"
+    watch_label.config(text=f"Watching {os.path.basename(current.directory)}: backlog {status['backlog']}, {status['files']} files imported, latency {latency}")
+    root.after(WATCH_STATUS_MS, lambda: show_watch_status(current))
 
 # show warning for duplicate file
 def show_duplicate_warning(message=None):
     if message:
         duplicate_label.config(text=message)
     duplicate_label.pack(side=RIGHT)
-    root.update_idletasks()
+
+# popup for sheets without Name, Month, or Year
+def show_missing_data_warning(message):
+    popup = Toplevel()
+    popup.title("Missing Data Warning")
+    popup.geometry("400x100+150+150")
+    Label(popup, text=message, justify="center", wraplength=380).pack(pady=10)
 
 
 
@@ -569,7 +702,11 @@ def delete_by_treeview():
 
     # existing entries treeview 
     # to display results
-    entries_tree = Treeview(popup, columns=("Entry_ID", "Name", "Month", "Year", "Contract_Name", "Project_Manager", "Hours", "Source_File"), show="headings")
+    entries_count = Label(pfram2, text="")
+    entries_count.pack()
+    entries_scroll = Scrollbar(popup, orient=VERTICAL)
+    entries_scroll.pack(side=RIGHT, fill=Y)
+    entries_tree = VirtualTreeview(popup, counter=entries_count, scrollbar=entries_scroll, columns=("Entry_ID", "Name", "Month", "Year", "Contract_Name", "Project_Manager", "Hours", "Source_File"), show="headings")
     for col in entries_tree["columns"]:
         entries_tree.heading(col, text=col)
         entries_tree.column(col, width=100)
@@ -581,7 +718,7 @@ def delete_by_treeview():
     Label(pfram1, text='File Name:').pack(side=LEFT)
     # adding of single line text box
     edit = Entry(pfram1) 
-    edit.bind("<Return>", lambda event: search(edit.get(), entries_tree, "Source_File", popup_tree_data))
+    edit.bind("<Return>", lambda event: search(edit.get(), entries_tree, "Source_File"))
 
 
     # position of text box
@@ -591,33 +728,28 @@ def delete_by_treeview():
     # search button
     sbutt = Button(pfram1, text='Search')  
     sbutt.pack(side=RIGHT) 
-    sbutt.config(command=lambda: search(edit.get(), entries_tree, "Source_File", popup_tree_data))
+    sbutt.config(command=lambda: search(edit.get(), entries_tree, "Source_File"))
 
     # delete button
     delete = Button(pfram3, text="Delete", padding=10)
-    delete.pack()
+    delete.pack(side=LEFT, padx=5)
     delete.config(command=lambda:get_selected_items(entries_tree))
+    # delete everything uploaded from the selected rows' files/sheets
+    delete_sheet = Button(pfram3, text="Delete Whole File/Sheet", padding=10)
+    delete_sheet.pack(side=LEFT, padx=5)
+    delete_sheet.config(command=lambda: get_selected_sheets(entries_tree))
     #popup.bind("<BackSpace>", lambda event: get_selected_items(entries_tree))
 
-    popup_tree_data = load_all_data()  # get data just for this popup
-    populate_tree(entries_tree, popup_tree_data)
+    populate_tree(entries_tree, entry_cache.entries(), {})
+
+# Entry_IDs of the selected rows, the tree uses them as item ids
+def selected_keys(tree):
+    return [int(iid) for iid in tree.selection()]
 
 # return selected items
 def get_selected_items(tree):
-    keys = []
-    selected_iids = tree.selection()
-    if selected_iids:
-        for iid in selected_iids:
-            item_data = tree.item(iid)
-            raw_value = item_data['values'][0]
-            try:
-                entry_id = int(str(raw_value).strip("(), "))  # Strip tuple-like chars
-                keys.append(entry_id)
-            except ValueError:
-                print(f"Skipping invalid entry ID: {raw_value}")
-
-        
-    else:
+    keys = selected_keys(tree)
+    if not keys:
         print("No items selected.")
 
     # create the popup
@@ -638,12 +770,44 @@ def get_selected_items(tree):
 
 # combines function for when yes button is clicked
 def on_yes_button_pressed(keys, window, tree):
-    delete_entries(keys)
+    deleted = delete_entries(keys)
     close_window(window)
-    # reload data for popup treeview
-    updated_popup_data = load_all_data()
-    populate_tree(tree, updated_popup_data)
-    refresh_all_trees()
+    # drop just the deleted rows from every open tree, popup included
+    refresh_all_trees(deleted=deleted)
+
+# confirm deleting the whole files/sheets behind the selected rows
+def get_selected_sheets(tree):
+    keys = selected_keys(tree)
+    if not keys:
+        print("No items selected.")
+        return
+    try:
+        sources = get_store().entry_sources(keys)
+    except Exception as e:
+        traceback.print_exc()
+        return
+
+    popup = Toplevel()
+    popup.title("WARNING!")
+    popup.geometry("300x250+100+50")
+
+    listed = "\n".join(f"{file_name} | {sheet_name}" for file_name, sheet_name in sources[:10])
+    if len(sources) > 10:
+        listed += f"\n...and {len(sources) - 10} more"
+    Label(popup, text=f"Warning! \nDelete every entry from: \n{listed} \nYou cannot undo this action.", justify="center").pack()
+
+    yesbutt = Button(popup, text="Yes")
+    yesbutt.pack()
+    yesbutt.config(command=lambda: on_delete_sheets_pressed(sources, popup))
+
+    nobutt = Button(popup, text="No")
+    nobutt.pack()
+    nobutt.config(command=lambda: close_window(popup))
+
+def on_delete_sheets_pressed(sources, window):
+    deleted = delete_sheets(sources)
+    close_window(window)
+    refresh_all_trees(deleted=deleted)
 
 # close chosen window
 def close_window(window):
@@ -652,23 +816,37 @@ def close_window(window):
 # delete the entries
 def delete_entries(keys):
     try:
-        conn = get_conn()
-        cursor = conn.cursor()
+        get_store().delete_entries(keys)
+        deleted = entry_cache.apply_deletes(keys)
 
-        print("Attempting to delete Entry_IDs:", keys)  # debug
+        # success popup
+        popup = Toplevel()
+        popup.title("Success!")
+        popup.geometry("250x50+100+50")
+        Label(popup, text="Success! Your file(s) were deleted.").pack(side=TOP)
+        return deleted
 
-        for key in keys:
-            print("Deleting Entry_ID:", key)  # debug
-            cursor.execute(f"DELETE FROM {TABLE_NAME} WHERE Entry_ID = ?", (key,))
+    except Exception as e:
+        traceback.print_exc()
+        popup = Toplevel()
+        popup.title("Error!")
+        popup.geometry("250x50+100+50")
+        Label(popup, text="Error. Your file(s) were NOT deleted.").pack(side=TOP)
+        return []
 
-        conn.commit()
-        conn.close()
+# delete whole file/sheet uploads
+def delete_sheets(sources):
+    try:
+        keys = get_store().delete_sheets(sources)
+        deleted = entry_cache.apply_deletes(keys)
+        print(f"Deleted {len(deleted)} entries from {len(sources)} file/sheet uploads")
 
         # success popup
         popup = Toplevel()
         popup.title("Success!")
         popup.geometry("250x50+100+50")
         Label(popup, text="Success! Your file(s) were deleted.").pack(side=TOP)
+        return deleted
 
     except Exception as e:
         traceback.print_exc()
@@ -676,50 +854,24 @@ def delete_entries(keys):
         popup.title("Error!")
         popup.geometry("250x50+100+50")
         Label(popup, text="Error. Your file(s) were NOT deleted.").pack(side=TOP)
+        return []
 
 # helper function
 def delete_by_file_and_sheet(file_name, sheet_name):
     try:
-        conn = get_conn()
-        cursor = conn.cursor()
-        cursor.execute(
-            f"DELETE FROM {TABLE_NAME} WHERE Source_File = ? AND Sheet_Name = ?",
-            (file_name, sheet_name),
-        )
-        conn.commit()
-        conn.close()
+        keys = get_store().delete_by_file_and_sheet(file_name, sheet_name)
+        entry_cache.apply_deletes(keys)
         print(f"Deleted all entries for {file_name} | {sheet_name}")
+        return keys
     except Exception as e:
         print(f"Error deleting sheet {sheet_name} from {file_name}: {e}")
         traceback.print_exc()
+        return []
 
 #check for file
 def file_check(file):
-    contains_file = False
-    count = 0
     try:
-        conn = get_conn()
-        cursor = conn.cursor()
-        cursor.execute(
-            f"""
-            SELECT
-                Source_File
-            FROM
-                {TABLE_NAME}
-            WHERE
-                Source_File LIKE ?;
-            """,
-            f"%{file}%",
-        )
-        rows = cursor.fetchall()
-        for (files,) in rows:
-            count += 1
-        conn.close()
-
-        if (count > 0):
-            contains_file = True
-
-        return contains_file
+        return get_store().file_exists(file)
 
     except Exception as e:
         print(f"Error: {e}")
@@ -757,74 +909,354 @@ def export_treeview_to_pdf(tree):
         print("PDF generation cancelled by user.")
         return
 
-    c = canvas.Canvas(filename, pagesize=letter)
-    width, height = letter
+    # get headings
+    columns = tree["columns"]
+    headings = [tree.heading(col)["text"] for col in columns]
 
-    x_offset = 50
-    y_offset = height - 50
-    row_height = 20
+    # render from the tree's backing rows on a worker thread
+    print_error_label.pack_forget()
+    report_label.config(text="Exporting PDF: 0%")
+    report_label.pack(side=RIGHT)
+    threading.Thread(target=run_report, args=(filename, headings, tree.live_rows()), name="report-worker", daemon=True).start()
 
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(x_offset, y_offset, "Timecard Report                                                           Total Hours Spent:")
+# build the PDF off the Tk thread, progress goes back through the UI queue
+def run_report(filename, headings, rows):
+    try:
+        # reportlab is imported on the first Print, not at startup
+        from report_engine import write_report
+        total_hours = write_report(filename, headings, rows, progress_callback=lambda percent: post_ui("report_progress", percent))
+        print(f"PDF saved as {filename} ({len(rows)} rows, {total_hours} hours)")
+        post_ui("report_done", filename)
+    except Exception as e:
+        print(f"PDF generation failed: {e}")
+        traceback.print_exc()
+        post_ui("report_failed", filename)
 
-    c.setFont("Helvetica", 12)
-    y_offset -= 25
-    c.drawString(x_offset, y_offset, "Generated by Timecard Vault                                                                       " + str(LAST_TOTAL_HOURS))
-    
-    y_offset -= 15
-    c.drawString(x_offset, y_offset, " ")
 
-    y_offset -= 30  # add some space before table
 
-    # get headings
-    columns = tree["columns"]
-    headings = [tree.heading(col)["text"] for col in columns]
+# diagnostics
+# per-phase timings from the metrics store, refreshed while the window is open
+def show_diagnostics():
+    popup = Toplevel()
+    popup.title("Diagnostics")
+    popup.geometry("800x420+100+50")
+
+    columns = ("Phase", "Count", "Avg ms", "P95 ms", "Max ms", "Total ms", "Rows", "Rows/s")
+    diag_tree = Treeview(popup, columns=columns, show="headings")
+    for col in columns:
+        diag_tree.heading(col, text=col)
+        diag_tree.column(col, width=150 if col == "Phase" else 80)
+    diag_tree.pack(fill=BOTH, expand=True, padx=10, pady=10)
+
+    pfram = Frame(popup)
+    pfram.pack(pady=5)
+    status_label = Label(popup, text="")
+    status_label.pack()
+
+    def redraw():
+        diag_tree.delete(*diag_tree.get_children())
+        for name, stats in sorted(metrics.summary().items()):
+            diag_tree.insert('', 'end', values=(
+                name, stats["count"], stats["avg_ms"], stats["p95_ms"], stats["max_ms"],
+                stats["total_ms"], stats["rows"] or "", stats["rows_per_s"] or "",
+            ))
+        # connection pool waits, kept by the storage layer once the database is open
+        pool = entry_cache.store.acquire_stats() if entry_cache.store is not None else {}
+        for operation, (count, avg_ms, max_ms) in sorted(pool.items()):
+            diag_tree.insert('', 'end', values=(f"connect {operation}", count, round(avg_ms, 3), "", round(max_ms, 3), "", "", ""))
+
+    def refresh():
+        if not popup.winfo_exists():
+            return
+        redraw()
+        popup.after(DIAGNOSTICS_REFRESH_MS, refresh)
+
+    def export():
+        path = filedialog.asksaveasfilename(
+            defaultextension=".jsonl",
+            filetypes=[("JSON Lines", "*.jsonl")],
+            initialfile="timecard_metrics.jsonl",
+            title="Export Timings As",
+        )
+        if not path:
+            return
+        try:
+            count = metrics.export_jsonl(path)
+            status_label.config(text=f"Exported {count} spans to {path}")
+        except Exception as e:
+            traceback.print_exc()
+            status_label.config(text=f"Export failed: {e}")
 
-    # draw headings
-    c.setFont("Helvetica-Bold", 8)
-    for i, heading in enumerate(headings):
-        c.drawString(x_offset + i * 68, y_offset, heading)
-
-    y_offset -= row_height
-
-    # get rows
-    c.setFont("Helvetica-Bold", 7)
-    for row_id in tree.get_children():
-        row = tree.item(row_id)['values']
-        for i, value in enumerate(row):
-            c.drawString(x_offset + i * 68, y_offset, str(value))
-        y_offset -= row_height
-        if y_offset < 50:
-            c.showPage()
-            y_offset = height - 50
-
-    c.save()
-    print(f"PDF saved as {filename}")
-
-    if os.path.exists(filename):
-        print_pdf(filename)
-    else:
-        print(f"Error: File not found at {filename}")
+    Button(pfram, text="Export JSON Lines", command=export).pack(side=LEFT, padx=5)
+    Button(pfram, text="Clear", command=lambda: (metrics.clear(), redraw())).pack(side=LEFT, padx=5)
+    refresh()
+
+
+''' Pivot '''
+# contract x period x employee totals of the cached entries; double-click a node to list its entries
+def show_pivot():
+    popup = Toplevel()
+    popup.title("Pivot")
+    popup.geometry("700x500+120+60")
+
+    pfram1 = Frame(popup)
+    pfram1.pack(pady=10)
+    pfram2 = Frame(popup)
+    pfram2.pack(pady=5)
+    pfram3 = Frame(popup)
+    pfram3.pack(fill=BOTH, expand=True, padx=10, pady=10)
+
+    # same filters as advanced search, every contract when the name is empty
+    Label(pfram1, text='Contract Name:').pack(side=LEFT)
+    contract = Entry(pfram1)
+    contract.pack(side=LEFT)
+    Label(pfram1, text='Month / Period:').pack(side=LEFT)
+    month = Entry(pfram1)
+    month.pack(side=LEFT)
+    Label(pfram1, text='Year:').pack(side=LEFT)
+    year = Entry(pfram1)
+    year.pack(side=LEFT)
+
+    Label(pfram2, text='Employees by:').pack(side=LEFT)
+    employee = Combobox(pfram2, values=[LEVEL_HEADINGS[column] for column in EMPLOYEE_COLUMNS], state="readonly", width=16)
+    employee.current(0)
+    employee.pack(side=LEFT, padx=5)
+    build_butt = Button(pfram2, text='Build')
+    build_butt.pack(side=LEFT, padx=5)
+    export_butt = Button(pfram2, text='Export')
+    export_butt.pack(side=LEFT, padx=5)
+    status_label = Label(popup, text="")
+    status_label.pack(pady=5)
+
+    pivot_scroll = Scrollbar(pfram3, orient=VERTICAL)
+    pivot_scroll.pack(side=RIGHT, fill=Y)
+    pivot_tree = Treeview(pfram3, columns=("Hours", "Entries"), yscrollcommand=pivot_scroll.set)
+    pivot_scroll.config(command=pivot_tree.yview)
+    pivot_tree.heading("#0", text="Contract / Period / Employee")
+    pivot_tree.heading("Hours", text="Hours")
+    pivot_tree.heading("Entries", text="Entries")
+    pivot_tree.column("#0", width=400)
+    pivot_tree.column("Hours", width=100, anchor=E)
+    pivot_tree.column("Entries", width=100, anchor=E)
+    pivot_tree.pack(side=LEFT, fill=BOTH, expand=True)
+
+    state = {"pivot": None, "keys": {}}  # tree item -> node key, outermost level first
+
+    # children are inserted when a node is first opened, not all at once
+    def insert_level(parent, key):
+        pivot = state["pivot"]
+        column = pivot.levels[len(key)]
+        for value, hours, entries in pivot.level(key):
+            item = pivot_tree.insert(parent, END, text=level_text(column, value), values=(round(hours, 2), entries))
+            state["keys"][item] = key + (value,)
+            if len(key) + 1 < len(pivot.levels):
+                pivot_tree.insert(item, END, text="")  # placeholder so the node can be opened
+
+    def show(result):
+        if not popup.winfo_exists():
+            return
+        build_butt.config(state=NORMAL)
+        if isinstance(result, Exception):
+            status_label.config(text=f"Pivot failed: {result}")
+            return
+        state["pivot"] = result
+        state["keys"] = {}
+        pivot_tree.delete(*pivot_tree.get_children())
+        insert_level("", ())
+        status_label.config(text=f"{len(result.level())} contracts, {result.entries} entries, {round(result.total_hours, 2)} hours")
+
+    def build(event=None):
+        filters = (contract.get().strip(), month.get().strip(), year.get().strip())
+        employee_column = EMPLOYEE_COLUMNS[employee.current()]
+        build_butt.config(state=DISABLED)
+        status_label.config(text="Building pivot...")
+
+        def run():
+            try:
+                result = build_pivot(entry_cache.entries(), *filters, employee=employee_column)
+            except Exception as e:
+                traceback.print_exc()
+                result = e
+            post_ui("call", (show, result))
+        threading.Thread(target=run, name="pivot-worker", daemon=True).start()
+
+    def on_open(event):
+        item = pivot_tree.focus()
+        children = pivot_tree.get_children(item)
+        if len(children) == 1 and children[0] not in state["keys"]:
+            pivot_tree.delete(children[0])
+            insert_level(item, state["keys"][item])
+
+    # show the node's entries in the main results tree
+    def drill_down(event):
+        item = pivot_tree.identify_row(event.y)
+        key = state["keys"].get(item)
+        if key is None:
+            return
+        matches = state["pivot"].matcher(key)
+        rows = [row for row in entry_cache.entries() if matches(row)]
+        populate_tree(results_tree, rows, row_filter=matches)
+        hours_label.configure(text="Total Hours: " + str(round(sum(row[6] or 0 for row in rows), 2)))
+        show_subtotals([])
+        return_contract(key[0])
+
+    def export():
+        pivot = state["pivot"]
+        if pivot is None:
+            status_label.config(text="Build the pivot first.")
+            return
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("PDF files", "*.pdf")],
+            initialfile="timecard_pivot.csv",
+            title="Export Pivot As",
+        )
+        if not filename:
+            return
+        status_label.config(text=f"Exporting to {filename}...")
+
+        # a long PDF renders off the Tk thread
+        def run():
+            try:
+                message = f"Exported {export_pivot(pivot, filename)} rows to {filename}"
+            except Exception as e:
+                traceback.print_exc()
+                message = f"Export failed: {e}"
+            post_ui("call", (lambda text: popup.winfo_exists() and status_label.config(text=text), message))
+        threading.Thread(target=run, name="pivot-export", daemon=True).start()
+
+    build_butt.config(command=build)
+    export_butt.config(command=export)
+    for entry in (contract, month, year):
+        entry.bind("<Return>", build)
+    pivot_tree.bind("<<TreeviewOpen>>", on_open)
+    pivot_tree.bind("<Double-1>", drill_down)
+    contract.focus_set()
+    build()
+
+
+''' Batch Reports '''
+# a PDF for each listed contract, or every contract with hours in the period, rendered in worker processes
+def show_batch_reports():
+    popup = Toplevel()
+    popup.title("Batch Reports")
+    popup.geometry("600x240+120+60")
+
+    pfram1 = Frame(popup)
+    pfram1.pack(pady=(20, 5))
+    pfram2 = Frame(popup)
+    pfram2.pack(pady=5)
+    pfram3 = Frame(popup)
+    pfram3.pack(pady=10)
+
+    Label(pfram1, text='Contracts:').pack(side=LEFT)
+    contracts = Entry(pfram1, width=50)
+    contracts.pack(side=LEFT, fill=BOTH, expand=1)
+    Label(pfram2, text='Month / Period:').pack(side=LEFT)
+    month = Entry(pfram2)
+    month.pack(side=LEFT)
+    Label(pfram2, text='Year:').pack(side=LEFT)
+    year = Entry(pfram2)
+    year.pack(side=LEFT)
+    Label(popup, text='Separate contracts with commas, leave empty for every contract with hours in the period').pack()
+
+    run_butt = Button(pfram3, text='Choose Folder and Run')
+    run_butt.pack(side=LEFT, padx=5)
+    stop_butt = Button(pfram3, text='Cancel', state=DISABLED)
+    stop_butt.pack(side=LEFT, padx=5)
+    bar = Progressbar(popup, orient=HORIZONTAL, length=400, mode='determinate')
+    bar.pack(pady=5)
+    status_label = Label(popup, text="")
+    status_label.pack()
+    state = {"cancel": None}
+
+    def show_progress(counts):
+        if not popup.winfo_exists():
+            return
+        done, total = counts
+        bar['value'] = done / total * 100 if total else 0
+        status_label.config(text=f"Rendering reports: {done} / {total}")
+
+    def finish(payload):
+        state["cancel"] = None
+        if not popup.winfo_exists():
+            return
+        out_dir, result = payload
+        run_butt.config(state=NORMAL)
+        stop_butt.config(state=DISABLED)
+        if isinstance(result, Exception):
+            status_label.config(text=f"Batch failed: {result}")
+            return
+        failed = sum(1 for item in result if item[4].startswith("failed"))
+        written = sum(1 for item in result if item[4] == "ok")
+        status_label.config(text=f"Wrote {written} reports ({failed} failed) to {out_dir}, see {REPORT_INDEX}")
+
+    def run():
+        out_dir = filedialog.askdirectory(title="Select Report Folder")
+        if not out_dir:
+            return
+        names = [name for name in contracts.get().split(",") if name.strip()] or None
+        period = (month.get().strip(), year.get().strip())
+        cancel_event = state["cancel"] = threading.Event()
+        run_butt.config(state=DISABLED)
+        stop_butt.config(state=NORMAL)
+        bar['value'] = 0
+        status_label.config(text="Reading entries...")
+
+        def work():
+            try:
+                result = write_contract_reports(out_dir, names, *period, progress_callback=lambda done, total: post_ui("call", (show_progress, (done, total))), cancel_event=cancel_event)
+            except Exception as e:
+                traceback.print_exc()
+                result = e
+            post_ui("call", (finish, (out_dir, result)))
+        threading.Thread(target=work, name="batch-reports", daemon=True).start()
+
+    def cancel():
+        if state["cancel"] is not None:
+            state["cancel"].set()
+            status_label.config(text="Cancelling...")
+
+    # closing the window stops the batch too
+    def close():
+        cancel()
+        popup.destroy()
 
+    run_butt.config(command=run)
+    stop_butt.config(command=cancel)
+    popup.protocol("WM_DELETE_WINDOW", close)
+    contracts.focus_set()
 
 
 ''' Button Assignment '''
 # search
 sbutt.config(command=search_and_calculate)
 edit.bind("<Return>", search_and_calculate)
+edit.bind("<KeyRelease>", on_search_key)
 # upload timecard
 ubutt.config(command=import_multiple_files)
+cancel_butt.config(command=cancel_imports)
+watch_butt.config(command=toggle_watch)
 # print 
 pbutt.config(command=lambda: export_treeview_to_pdf(results_tree))
 # delete
 dbutt.config(command=delete_by_treeview)
 # advanced search
 asbutt.config(command=advanced_search)
+# pivot
+pivbutt.config(command=show_pivot)
+# batch reports
+batch_butt.config(command=show_batch_reports)
+# diagnostics
+diag_butt.config(command=show_diagnostics)
 
 
 ''' Window Loop '''
-main_tree_data = load_all_data()
-populate_tree(results_tree, main_tree_data)
+mark_startup("widgets")
+populate_tree(results_tree, [], {})
+root.after(UI_POLL_MS, poll_ui_queue)
+root.after_idle(lambda: mark_startup("window"))
+start_initial_load()
 root.mainloop()
 
 
@@ -0,0 +1,407 @@
+''' Imports '''
+import os
+import traceback
+import time
+import hashlib
+import threading
+from storage import open_storage, contract_key, INSERT_COLUMNS
+from ingest_manifest import IngestManifest, DUPLICATE, CHANGED, UNKNOWN
+from migrations import migrate
+from metrics import metrics, span
+from periods import period_key
+
+''' Configurations '''
+ACCESS_DB = r"file path"
+SQLITE_DB = r"timecard_vault.db"
+STORAGE_BACKEND = "access"  # "access" or "sqlite"
+INSERT_BATCH_SIZE = 1000  # rows sent per executemany call
+# the only timecard columns the import uses, read as text except Totals
+EXCEL_DTYPES = {
+    "Name": str,
+    "Month": str,
+    "Year": str,
+    "Contract Name": str,
+    "Project Manager": str,
+    "Totals": object,
+}
+pd = None  # pandas, imported by the first workbook read since it costs seconds at startup
+
+
+
+''' Connect to Storage '''
+# open the configured database and bring its schema up to date
+def get_storage():
+    if STORAGE_BACKEND == "sqlite":
+        storage = open_storage("sqlite", SQLITE_DB)
+    else:
+        storage = open_storage("access", ACCESS_DB)
+    migrate(storage)
+    return storage
+
+# the storage every caller shares, opened on first use
+# the window opens it from its load thread while an import may already be asking for it
+store = None
+store_lock = threading.Lock()
+def get_store():
+    global store
+    with store_lock:
+        if store is None:
+            store = get_storage()
+    return store
+
+# point the core at another backend/database (CLI flags) before first use
+def configure(backend=None, path=None):
+    global STORAGE_BACKEND, ACCESS_DB, SQLITE_DB, store
+    if backend:
+        STORAGE_BACKEND = backend
+    if path:
+        if STORAGE_BACKEND == "sqlite":
+            SQLITE_DB = path
+        else:
+            ACCESS_DB = path
+    store = None
+
+
+''' Lazy Imports '''
+def load_pandas():
+    global pd
+    if pd is None:
+        import pandas
+        pd = pandas
+    return pd
+
+
+''' Read Workbooks '''
+# pick the fastest installed Excel engine
+def excel_engine():
+    try:
+        import python_calamine  # noqa: F401
+        return "calamine"
+    except ImportError:
+        return None  # let pandas choose xlrd/openpyxl
+
+# keep only the timecard columns (headers may carry stray spaces)
+def is_needed_column(col):
+    return str(col).strip() in EXCEL_DTYPES
+
+# parse one sheet with the fixed column set and dtypes
+def parse_sheet(xls, sheet_name):
+    return xls.parse(sheet_name, usecols=is_needed_column, dtype=EXCEL_DTYPES)
+
+# open the workbook once and return {sheet name: frame}
+# a sheet that can't be parsed is left out and added to skipped as (sheet name, error)
+def read_workbook(file_path, skipped=None):
+    load_pandas()
+    sheets = {}
+    with span("excel parse", file=os.path.basename(file_path)) as timing:
+        with pd.ExcelFile(file_path, engine=excel_engine()) as xls:
+            for sheet_name in xls.sheet_names:
+                # Skip sheets named 'example' (case-insensitive)
+                if sheet_name.strip().lower() == "example":
+                    print(f"Skipping sheet named 'example' in {file_path}")
+                    continue
+                try:
+                    sheets[sheet_name] = parse_sheet(xls, sheet_name)
+                except Exception as e:
+                    print(f"Skipping sheet '{sheet_name}' in '{file_path}' — could not be read: {e}")
+                    if skipped is not None:
+                        skipped.append((sheet_name, e))
+        timing["rows"] = sum(len(df) for df in sheets.values())
+    return sheets
+
+# fingerprint of a sheet's raw cells, so renamed copies are still recognised
+def sheet_hash(df):
+    digest = hashlib.sha256("\x1f".join(str(col).strip() for col in df.columns).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+''' Clean and Upload Data '''
+# one sheet in its own transaction, through the same prepare/write path as whole workbooks
+# notify(kind, message) lets a front end show the duplicate and missing-data warnings
+# with replace, a sheet whose content changed since its last import swaps out its old rows
+def import_timecard(file_path, sheet_name=None, progress_callback=None, df=None, cancel_event=None, notify=None, manifest=None, replace=False):
+    # Skip sheets named 'example' (case-insensitive)
+    if sheet_name and sheet_name.strip().lower() == "example":
+        print(f"Skipping sheet named 'example' in {file_path}")
+        return 0
+
+    load_pandas()
+    try:
+        if df is None:
+            with span("excel parse", file=os.path.basename(file_path), sheet=sheet_name) as timing:
+                with pd.ExcelFile(file_path, engine=excel_engine()) as xls:
+                    df = parse_sheet(xls, sheet_name if sheet_name is not None else 0)
+                timing["rows"] = len(df)
+        sheet = prepare_sheet(file_path, sheet_name, df)
+
+        if manifest is None:
+            manifest = IngestManifest(get_store()).load()
+        rows = write_prepared_workbook(file_path, [sheet], manifest, replace, notify, progress_callback, cancel_event)
+
+        if progress_callback:
+            progress_callback(100)
+
+        return rows
+
+    except Exception as e:
+        print(f"Failed to import {file_path} (sheet: {sheet_name}): {e}")
+        return 0
+
+# NEW or CHANGED (to be replaced) from the manifest, None when the sheet is skipped
+# a sheet listed without a hash (imported before the manifest) takes this hash and is skipped
+def sheet_status(manifest, content_hash, file_name, sheet_name, replace=False, notify=None):
+    status = manifest.check(content_hash, file_name, sheet_name)
+    if status == DUPLICATE:
+        print(f"Duplicate: {file_name} | {sheet_name} — skipping")
+        if notify:
+            notify("duplicate", f"Duplicate: {file_name} ({sheet_name})")
+        return None
+    if status == UNKNOWN:
+        # imported before hashes were kept: take this content as what was imported
+        print(f"Already imported: {file_name} | {sheet_name} — skipping, recorded its content hash")
+        manifest.backfill(content_hash, file_name, sheet_name)
+        if notify:
+            notify("duplicate", f"Already imported: {file_name} ({sheet_name})")
+        return None
+    if status == CHANGED and not replace:
+        print(f"Changed since last upload: {file_name} | {sheet_name} — skipping, upload with replace to update it")
+        if notify:
+            notify("duplicate", f"Changed since last upload: {file_name} ({sheet_name}), use Replace to update it")
+        return None
+    if status == CHANGED:
+        print(f"Replacing: {file_name} | {sheet_name}")
+        if notify:
+            notify("replaced", f"Replaced: {file_name} ({sheet_name})")
+    return status
+
+# clean one parsed sheet into INSERT_COLUMNS form; None when the sheet is skipped (printed and notified)
+def clean_timecard(df, file_path, sheet_name=None, notify=None):
+    clean_start = time.perf_counter()
+    try:
+        # clean column names
+        df.columns = df.columns.str.strip()
+        df["Totals"] = pd.to_numeric(df["Totals"], errors="coerce")
+        df = df.dropna(subset=["Totals"])
+
+        # select and rename relevant columns
+        df = df[["Name", "Month", "Year", "Contract Name", "Project Manager", "Totals"]]
+        df.columns = ["Name", "Month", "Year", "Contract_Name", "Project_Manager", "Hours"]
+
+        # remove spaces from data
+        df["Month"] = df["Month"].astype(str).str.replace(" ", "", regex=False)
+        df["Contract_Name"] = df["Contract_Name"].astype(str).str.replace(" ", "", regex=False)
+        df["Project_Manager"] = df["Project_Manager"].astype(str).str.replace(" ", "", regex=False)
+        df["Hours"] = df["Hours"].astype(str).str.replace(" ", "", regex=False)
+
+        # fill down Name, Month, and Year from the first non-empty cell
+        # check if values exist
+        try:
+            df["Name"] = df["Name"].dropna().iloc[0]
+            df["Month"] = df["Month"].dropna().iloc[0]
+            df["Year"] = df["Year"].dropna().iloc[0]
+        except IndexError:
+            print(f"Skipping sheet '{sheet_name}' in '{file_path}' — missing Name/Month/Year")
+
+            # popup UI warning
+            if notify:
+                notify("missing_data", f"'{sheet_name}' in {os.path.basename(file_path)}\nis missing Name, Month, or Year.\nSheet skipped.")
+
+            return None
+
+        # numeric YYYYMM period for indexed month/year searches
+        df["Period"] = period_key(df["Month"].iloc[0], df["Year"].iloc[0])
+        
+        # remove 0s from total hours
+        df["Hours"] = pd.to_numeric(df["Hours"], errors="coerce")
+        df = df[df["Hours"] > 0]
+
+        # Remove rows where Contract_Name is NaN
+        df = df.dropna(subset=["Contract_Name"])
+
+        # Remove rows where Contract_Name is blank, whitespace or a stringified NaN
+        df["Contract_Name"] = df["Contract_Name"].astype(str).str.strip()
+        df = df[~df["Contract_Name"].str.lower().isin(["", "nan"])]
+        df["Contract_Key"] = df["Contract_Name"].map(contract_key)
+
+
+        # add filename source
+        path = file_path.replace(" ", "")
+        df["Source_File"] = os.path.basename(path)
+        df["Sheet_Name"] = sheet_name
+        metrics.record("cleaning", time.perf_counter() - clean_start, len(df), file=os.path.basename(path), sheet=sheet_name)
+
+    except Exception as e:
+        print(f"Error processing {file_path} | Sheet: {sheet_name}: {e}")
+        traceback.print_exc()
+        return None
+    return df
+
+# build parameter tuples from the cleaned frame in one pass
+def build_insert_rows(df):
+    # object dtype turns numpy scalars into plain python values the driver can bind
+    return list(df[INSERT_COLUMNS].astype(object).itertuples(index=False, name=None))
+
+# insert a cleaned sheet in the open transaction, first removing the version it replaces;
+# returns the removed Entry_IDs
+def write_sheet(rows, content_hash, file_name, sheet_name, manifest, replace_old, progress_callback=None, cancel_event=None):
+    removed = get_store().remove_file_and_sheet(file_name, sheet_name) if replace_old else []
+    insert_rows(rows, progress_callback, cancel_event)
+    if rows:
+        manifest.record(content_hash, file_name, sheet_name, len(rows))
+    return removed
+
+# raised inside an import when the user presses Cancel
+class ImportCancelled(Exception):
+    pass
+
+# send rows to the database in batches inside the caller's transaction
+def insert_rows(rows, progress_callback=None, cancel_event=None):
+    row_count = len(rows)
+
+    for start in range(0, row_count, INSERT_BATCH_SIZE):
+        if cancel_event is not None and cancel_event.is_set():
+            raise ImportCancelled()
+        batch = rows[start:start + INSERT_BATCH_SIZE]
+        with span("db insert", rows=len(batch)):
+            get_store().insert_batch(batch)
+
+        # update progress once per batch
+        if progress_callback:
+            percent = ((start + len(batch)) / row_count) * 100
+            progress_callback(percent)
+
+# parse-side half of an import, no database access so it can run in a worker process:
+# the sheet's content hash, its cleaned INSERT_COLUMNS rows (None when skipped) and the notices cleaning raised
+def prepare_sheet(file_path, sheet_name, df):
+    notices = []
+    content_hash = sheet_hash(df)
+    df = clean_timecard(df, file_path, sheet_name, notify=lambda kind, message: notices.append((kind, message)))
+    rows = None if df is None else build_insert_rows(df)
+    return {"sheet": sheet_name, "hash": content_hash, "rows": rows, "notices": notices}
+
+# every sheet of a workbook through prepare_sheet; an unreadable sheet only carries the notice that it was skipped
+def prepare_sheets(file_path):
+    skipped = []
+    sheets = read_workbook(file_path, skipped)
+    prepared = [prepare_sheet(file_path, sheet_name, df) for sheet_name, df in sheets.items()]
+    for sheet_name, error in skipped:
+        message = f"'{sheet_name}' in {os.path.basename(file_path)}\ncould not be read ({error}).\nSheet skipped."
+        prepared.append({"sheet": sheet_name, "hash": None, "rows": None, "notices": [("missing_data", message)]})
+    return prepared
+
+# write-side half: insert a workbook's prepared sheets in the open transaction
+# returns the rows written; Entry_IDs removed by replace are added to replaced
+def write_prepared_sheets(file_path, sheets, manifest, replace=False, notify=None, progress_callback=None, cancel_event=None, replaced=None):
+    file_name = os.path.basename(file_path).replace(" ", "")
+    total_rows = 0
+
+    for sheet in sheets:
+        if cancel_event is not None and cancel_event.is_set():
+            raise ImportCancelled()
+        if progress_callback:
+            progress_callback(0)
+        sheet_name, rows = sheet["sheet"], sheet["rows"]
+        if sheet["hash"] is None:
+            # never read, nothing to check or write
+            if notify:
+                for kind, message in sheet["notices"]:
+                    notify(kind, message)
+            continue
+
+        with span("duplicate check", rows=len(rows or ()), file=file_name, sheet=sheet_name):
+            status = sheet_status(manifest, sheet["hash"], file_name, sheet_name, replace, notify)
+        if status is None:
+            continue
+        if notify:
+            for kind, message in sheet["notices"]:
+                notify(kind, message)
+        if rows is None:
+            continue
+
+        removed = write_sheet(rows, sheet["hash"], file_name, sheet_name, manifest, status == CHANGED, progress_callback, cancel_event)
+        if replaced is not None:
+            replaced.extend(removed)
+        print(f"Imported: {file_path} | Sheet: {sheet_name}")
+        total_rows += len(rows)
+    return total_rows
+
+# commit a workbook's prepared sheets in one transaction
+# returns the rows committed; a failed workbook is rolled back and the error re-raised
+def write_prepared_workbook(file_path, sheets, manifest, replace=False, notify=None, progress_callback=None, cancel_event=None):
+    replaced = []
+    try:
+        with get_store().transaction("import"):
+            total_rows = write_prepared_sheets(file_path, sheets, manifest, replace, notify, progress_callback, cancel_event, replaced)
+    except ImportCancelled:
+        manifest.rollback()
+        print(f"Import cancelled, rolled back {file_path}")
+        return 0
+    except Exception as e:
+        manifest.rollback()
+        print(f"Rolled back {file_path}: {e}")
+        raise
+
+    manifest.commit()
+    if replaced and notify:
+        notify("deleted", replaced)
+    return total_rows
+
+# import every sheet of a workbook in one transaction
+# returns the rows committed; a failed workbook is rolled back and the error re-raised
+# pass one loaded manifest to every workbook of a batch; Entry_IDs removed by replace go to notify("deleted")
+def import_workbook(file_path, progress_callback=None, cancel_event=None, notify=None, manifest=None, replace=False):
+    start = time.perf_counter()
+    prepared = prepare_sheets(file_path)
+    parse_time = time.perf_counter() - start
+
+    if manifest is None:
+        manifest = IngestManifest(get_store()).load()
+    total_rows = write_prepared_workbook(file_path, prepared, manifest, replace, notify, progress_callback, cancel_event)
+    if cancel_event is not None and cancel_event.is_set():
+        return total_rows
+
+    # report throughput
+    elapsed = time.perf_counter() - start
+    rate = total_rows / elapsed if elapsed > 0 else 0
+    print(f"Committed {total_rows} rows from {os.path.basename(file_path)} in {elapsed:.2f}s ({rate:.0f} rows/s, parse and clean {parse_time:.2f}s)")
+    return total_rows
+
+# load the ingest manifest once at the start of a batch of imports
+def load_manifest():
+    return IngestManifest(get_store()).load()
+
+
+''' Batch Helpers '''
+# every timecard workbook in a directory, oldest name first
+def find_workbooks(directory, recursive=False):
+    paths = []
+    for folder, subfolders, files in os.walk(directory):
+        for file_name in files:
+            if os.path.splitext(file_name)[1].lower().startswith(".xls") and not file_name.startswith("~$"):
+                paths.append(os.path.join(folder, file_name))
+        if not recursive:
+            break
+    return sorted(paths)
+
+# contract search term cleaned the way the search box cleans it
+def clean_contract(contract):
+    return (contract or "").strip().replace(" ", "")
+
+# total hours for a contract, optionally narrowed to a month and/or year
+def contract_totals(contract, month=None, year=None):
+    return get_store().sum_hours(clean_contract(contract), month or None, year or None)
+
+# [(Period, hours)] for a contract over a month, year, range ("Oct 2023 - Mar 2024") or fiscal year ("FY25")
+def contract_period_hours(contract, month=None, year=None):
+    return get_store().period_hours(clean_contract(contract), month or None, year or None)
+
+# write one contract's entries to a PDF; returns (rows, total hours)
+def contract_report(contract, filename, month=None, year=None, progress_callback=None):
+    # reportlab is only needed when a report is actually written
+    from report_engine import write_report
+    from storage import ENTRY_COLUMNS
+
+    rows = get_store().search(clean_contract(contract), month or None, year or None)
+    total_hours = write_report(filename, ENTRY_COLUMNS, rows, progress_callback=progress_callback)
+    return len(rows), total_hours
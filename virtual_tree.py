@@ -0,0 +1,116 @@
+''' Imports '''
+from tkinter.ttk import Treeview
+
+''' Configurations '''
+PAGE_SIZE = 200  # rows materialized per page, well past what fits on screen
+PREFETCH_AT = 0.9  # load the next page once the view scrolls past this fraction
+COMPACT_AT = 0.25  # drop deleted rows from the backing list once they are this fraction of it
+
+
+''' Virtual Treeview '''
+# Treeview that keeps the full result set in Python and only inserts rows as they scroll into view
+# deletes leave a None in the backing list (found through an Entry_ID -> position map) and the list
+# is compacted once enough of them pile up, so a change set never copies the whole result set
+class VirtualTreeview(Treeview):
+    def __init__(self, master=None, page_size=PAGE_SIZE, counter=None, scrollbar=None, **kw):
+        super().__init__(master, **kw)
+        self.page_size = page_size
+        self.counter = counter  # label showing "Showing X of N"
+        self.scrollbar = scrollbar
+        self.rows = []  # backing data, ENTRY_COLUMNS tuples, None where a row was deleted
+        self.positions = None  # Entry_ID -> index in rows, built on the first delete
+        self.dead = 0  # None slots in rows
+        self.row_filter = None  # decides which newly imported rows join this view, None takes none
+        self.shown = 0  # how far into rows the widget is loaded
+        self.shown_rows = 0  # live rows in the widget
+        self.loading = False
+        self.configure(yscrollcommand=self.on_scroll)
+        if scrollbar is not None:
+            scrollbar.configure(command=self.yview)
+
+    # swap in a new result set, clearing the widget in one call
+    # the rows are copied since deletes edit the list in place and callers cache theirs
+    def set_rows(self, rows, row_filter=None):
+        self.rows = list(rows)
+        self.positions = None
+        self.dead = 0
+        self.row_filter = row_filter
+        self.shown = 0
+        self.shown_rows = 0
+        children = self.get_children()
+        if children:
+            self.delete(*children)
+        self.load_more()
+
+    def clear(self):
+        self.set_rows([])
+
+    # the live rows as a new list, safe to hand to a worker thread
+    def live_rows(self):
+        if not self.dead:
+            return list(self.rows)
+        return [row for row in self.rows if row is not None]
+
+    # materialize the next page, keyed by Entry_ID
+    def load_more(self):
+        self.loading = False
+        added = 0
+        while self.shown < len(self.rows) and added < self.page_size:
+            row = self.rows[self.shown]
+            self.shown += 1
+            if row is not None:
+                self.insert('', 'end', iid=str(row[0]), values=row)
+                added += 1
+        self.shown_rows += added
+        self.update_counter()
+
+    # apply one change set without rebuilding the view; widget and list work is proportional to the change
+    def apply_changes(self, inserted=(), deleted=()):
+        if deleted:
+            if self.positions is None:
+                self.positions = {row[0]: index for index, row in enumerate(self.rows) if row is not None}
+            gone = []
+            for entry_id in set(deleted):
+                index = self.positions.pop(entry_id, None)
+                if index is None:
+                    continue
+                self.rows[index] = None
+                self.dead += 1
+                if index < self.shown:
+                    gone.append(str(entry_id))
+            if gone:
+                self.delete(*gone)
+                self.shown_rows -= len(gone)
+            if self.dead > COMPACT_AT * len(self.rows):
+                self.compact()
+
+        if inserted and self.row_filter is not None:
+            added = [row for row in inserted if self.row_filter(row)]
+            fully_shown = self.shown == len(self.rows)
+            if self.positions is not None:
+                self.positions.update((row[0], len(self.rows) + offset) for offset, row in enumerate(added))
+            self.rows.extend(added)
+            # new Entry_IDs sort last, so they only go into the widget if its end is already loaded
+            if fully_shown:
+                self.load_more()
+
+        self.update_counter()
+
+    # drop the None slots; every live row before the load position is in the widget
+    def compact(self):
+        self.rows = [row for row in self.rows if row is not None]
+        self.positions = {row[0]: index for index, row in enumerate(self.rows)}
+        self.dead = 0
+        self.shown = self.shown_rows
+
+    def update_counter(self):
+        if self.counter is not None:
+            self.counter.configure(text=f"Showing {self.shown_rows} of {len(self.rows) - self.dead}")
+
+    # yscrollcommand: keep the scrollbar in step and fetch ahead near the bottom
+    def on_scroll(self, first, last):
+        if self.scrollbar is not None:
+            self.scrollbar.set(first, last)
+        if float(last) >= PREFETCH_AT and self.shown < len(self.rows) and not self.loading:
+            self.loading = True
+            self.after_idle(self.load_more)
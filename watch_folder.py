@@ -0,0 +1,255 @@
+''' Imports '''
+import hashlib
+import json
+import os
+import threading
+import time
+import traceback
+from contextlib import nullcontext
+from datetime import datetime
+import vault_core
+from metrics import metrics, span
+
+''' Configurations '''
+WATCH_INTERVAL_SECONDS = 5  # how often the drop folder is scanned
+WATCH_SETTLE_SECONDS = 3  # a batch waits until no file has changed for this long (copies in progress, bursts of drops)
+WATCH_MAX_BATCH = 50  # workbooks committed per transaction, a bigger backlog is split
+WATCH_REPLACE = True  # a changed workbook replaces the sheets it imported before
+WATCH_CHECKPOINT = ".timecard_watch.json"  # kept in the watched folder unless another path is given
+WATCH_MAX_RETRIES = 5  # polls a workbook whose write keeps failing stays queued before it is checkpointed as failed
+HASH_CHUNK_BYTES = 1 << 20
+
+
+''' Helpers '''
+# content fingerprint of a workbook, only taken when its size or mtime moved
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def file_stat(path):
+    stat = os.stat(path)
+    return stat.st_mtime, stat.st_size
+
+
+''' Folder Watcher '''
+# polls a drop folder and imports new or changed workbooks in batches
+# the checkpoint maps each workbook to the mtime/size/hash it was last handled at, so
+# unchanged files are skipped without being opened; it survives restarts
+class FolderWatcher:
+    def __init__(self, directory, checkpoint_path=None, recursive=False, replace=WATCH_REPLACE, notify=None,
+                 on_batch=None, lock=None, interval=WATCH_INTERVAL_SECONDS, settle=WATCH_SETTLE_SECONDS):
+        self.directory = directory
+        self.checkpoint_path = checkpoint_path or os.path.join(directory, WATCH_CHECKPOINT)
+        self.recursive = recursive
+        self.replace = replace
+        self.notify = notify  # notify(kind, message) like the imports, "deleted" carries replaced Entry_IDs
+        self.on_batch = on_batch  # on_batch(status) after every committed batch
+        self.lock = lock or nullcontext()  # held while writing, shared with other importers in the process
+        self.interval = interval
+        self.settle = settle
+        self.checkpoint = {}  # path -> {"mtime", "size", "hash", "rows", "handled_at", "error"}
+        self.pending = {}  # path -> {"mtime", "size", "seen", "changed", "retries"} waiting to settle
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.status = {"backlog": 0, "batches": 0, "files": 0, "rows": 0, "failed": 0,
+                       "last_batch_rows": 0, "last_latency_s": None, "max_latency_s": None, "last_scan": None}
+
+    def load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path) as f:
+                self.checkpoint = json.load(f).get("files", {})
+        except FileNotFoundError:
+            self.checkpoint = {}
+        except (OSError, ValueError) as e:
+            print(f"Unreadable watch checkpoint {self.checkpoint_path}, starting over: {e}")
+            self.checkpoint = {}
+        return self
+
+    # written to a temporary file first so a crash never leaves half a checkpoint
+    def save_checkpoint(self):
+        temp_path = self.checkpoint_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"directory": self.directory, "files": self.checkpoint}, f, indent=1)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def unchanged(self, path, mtime, size):
+        entry = self.checkpoint.get(path)
+        return entry is not None and entry["mtime"] == mtime and entry["size"] == size
+
+    # queue new or changed workbooks; returns the backlog depth
+    def scan(self):
+        now = time.time()
+        for path in vault_core.find_workbooks(self.directory, self.recursive):
+            try:
+                mtime, size = file_stat(path)
+            except OSError:
+                continue  # removed or renamed mid-scan
+            if self.unchanged(path, mtime, size):
+                self.pending.pop(path, None)
+                continue
+            entry = self.pending.get(path)
+            if entry is None:
+                self.pending[path] = {"mtime": mtime, "size": size, "seen": now, "changed": now}
+            elif (entry["mtime"], entry["size"]) != (mtime, size):
+                # still being written, wait for it to settle again
+                entry.update(mtime=mtime, size=size, changed=now, retries=0)
+
+        # files that vanished before they were imported
+        for path in [path for path in self.pending if not os.path.exists(path)]:
+            del self.pending[path]
+
+        if len(self.pending) != self.status["backlog"]:
+            print(f"Watch: backlog {len(self.pending)} workbooks")
+        self.status["backlog"] = len(self.pending)
+        self.status["last_scan"] = datetime.now().isoformat(timespec="seconds")
+        return len(self.pending)
+
+    # the whole backlog once nothing has changed for settle seconds, so a burst of drops is one batch
+    def ready(self):
+        if not self.pending:
+            return []
+        if time.time() - max(entry["changed"] for entry in self.pending.values()) < self.settle:
+            return []
+        return sorted(self.pending, key=lambda path: self.pending[path]["seen"])[:WATCH_MAX_BATCH]
+
+    # parse and clean the batch, then commit every workbook in it in one transaction
+    # returns the rows committed
+    def process(self, paths):
+        entries = {path: self.pending[path] for path in paths}
+        prepared = []
+        for path in paths:
+            entry = self.pending[path]
+            try:
+                content_hash = file_hash(path)
+                previous = self.checkpoint.get(path)
+                if previous is not None and previous.get("hash") == content_hash:
+                    # touched or copied over with the same bytes, nothing to import
+                    self.mark(path, entry, content_hash, previous.get("rows", 0))
+                    continue
+                prepared.append((path, content_hash, vault_core.prepare_sheets(path)))
+            except Exception as e:
+                # an unreadable workbook is retried once it changes again
+                print(f"Watch: failed to read {path}: {e}")
+                self.mark(path, entry, None, 0, error=str(e))
+                self.status["failed"] += 1
+
+        rows = {}
+        if prepared:
+            with self.lock:
+                try:
+                    rows = self.write_batch(prepared)
+                except Exception as e:
+                    print(f"Watch: batch of {len(prepared)} workbooks rolled back ({e}), importing them one at a time")
+                    traceback.print_exc()
+                    rows = self.write_each(prepared, entries)
+            for path, content_hash, sheets in prepared:
+                if path in rows:
+                    self.mark(path, entries[path], content_hash, rows[path])
+
+        self.save_checkpoint()
+        self.status["backlog"] = len(self.pending)
+        if rows:
+            self.finish_batch(rows, entries)
+        return sum(rows.values())
+
+    # {path: rows committed}
+    def write_batch(self, prepared):
+        manifest = vault_core.load_manifest()
+        replaced = []
+        rows = {}
+        with span("watch batch", files=len(prepared)) as timing:
+            try:
+                with vault_core.get_store().transaction("watch"):
+                    for path, content_hash, sheets in prepared:
+                        rows[path] = vault_core.write_prepared_sheets(path, sheets, manifest, self.replace, self.notify, replaced=replaced)
+            except Exception:
+                manifest.rollback()
+                raise
+            manifest.commit()
+            timing["rows"] = sum(rows.values())
+
+        if replaced and self.notify:
+            self.notify("deleted", replaced)
+        return rows
+
+    # fallback after a failed batch: one transaction per workbook so one bad file cannot hold up the rest
+    # a failed write (database busy, share gone) stays queued and is retried on the next poll,
+    # only after WATCH_MAX_RETRIES is it checkpointed as failed until the file changes
+    def write_each(self, prepared, entries):
+        manifest = vault_core.load_manifest()
+        rows = {}
+        for path, content_hash, sheets in prepared:
+            try:
+                rows[path] = vault_core.write_prepared_workbook(path, sheets, manifest, self.replace, self.notify)
+            except Exception as e:
+                entry = entries[path]
+                entry["retries"] = entry.get("retries", 0) + 1
+                self.status["failed"] += 1
+                if entry["retries"] < WATCH_MAX_RETRIES:
+                    print(f"Watch: failed to import {path}, retrying on the next poll: {e}")
+                else:
+                    print(f"Watch: failed to import {path} {entry['retries']} times, skipped until it changes: {e}")
+                    self.mark(path, entry, None, 0, error=str(e))
+        return rows
+
+    # checkpoint a handled workbook and take it off the backlog
+    def mark(self, path, entry, content_hash, rows, error=None):
+        self.checkpoint[path] = {
+            "mtime": entry["mtime"],
+            "size": entry["size"],
+            "hash": content_hash,
+            "rows": rows,
+            "handled_at": datetime.now().isoformat(timespec="seconds"),
+            "error": error,
+        }
+        self.pending.pop(path, None)
+
+    # latency runs from the scan that first saw a file to the commit that stored it
+    def finish_batch(self, rows, entries):
+        now = time.time()
+        latencies = []
+        for path, count in rows.items():
+            latencies.append(now - entries[path]["seen"])
+            metrics.record("watch latency", latencies[-1], count, file=os.path.basename(path), backlog=len(self.pending))
+        self.status["batches"] += 1
+        self.status["files"] += len(rows)
+        self.status["rows"] += sum(rows.values())
+        self.status["last_batch_rows"] = sum(rows.values())
+        if latencies:
+            self.status["last_latency_s"] = round(max(latencies), 2)
+            self.status["max_latency_s"] = round(max(latencies + [self.status["max_latency_s"] or 0]), 2)
+        print(f"Watch: committed {self.status['last_batch_rows']} rows from {len(rows)} workbooks, "
+              f"latency {self.status['last_latency_s']}s, backlog {len(self.pending)}")
+        if self.on_batch:
+            self.on_batch(dict(self.status))
+
+    # one scan and, when the backlog has settled, one batch; returns the rows committed
+    def poll(self):
+        self.scan()
+        paths = self.ready()
+        if not paths:
+            return 0
+        return self.process(paths)
+
+    def run(self):
+        self.load_checkpoint()
+        print(f"Watching {self.directory} every {self.interval}s (checkpoint {self.checkpoint_path})")
+        while not self.stop_event.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Watch: scan of {self.directory} failed: {e}")
+            self.stop_event.wait(self.interval)
+
+    # run in a daemon thread, e.g. next to the Tk loop
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="folder-watch", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()